@@ -1,24 +1,21 @@
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
+import asyncio
+import hashlib
 import os
+import time
 
-from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from config import settings
 
-from database import engine
+from sessions import get_session
 from models import Admin
 
-# -------------------------
-# Database session
-# -------------------------
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 
 # -------------------------
 # Environment-based config
@@ -38,7 +35,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 # -------------------------
 # Password helpers
 # -------------------------
+# bcrypt and jose are imported on first use: only admin requests need them,
+# and keeping them out of module import shortens cold starts
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(
         plain_password.encode("utf-8"),
         hashed_password.encode("utf-8"),
@@ -46,11 +47,80 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
+    import bcrypt
+
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
+# bcrypt releases the GIL, so checks run in parallel on their own small
+# pool instead of the event loop or the threadpool shared with routes
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_CHECK_WORKERS,
+    thread_name_prefix="password-check",
+)
+
+
+class PasswordCheckStats:
+    WINDOW = 256
+
+    def __init__(self):
+        self.pending = 0
+        self.checks = 0
+        self.rejected = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=self.WINDOW)
+
+    def record(self, seconds: float) -> None:
+        self.checks += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            "workers": settings.PASSWORD_CHECK_WORKERS,
+            "pending": self.pending,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "latency_avg_ms": round(self.total / self.checks * 1000, 3) if self.checks else 0.0,
+            "latency_p95_ms": round(recent[int(len(recent) * 0.95)] * 1000, 3) if recent else 0.0,
+            "latency_max_ms": round(self.max * 1000, 3),
+        }
+
+
+password_check_stats = PasswordCheckStats()
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password on the bounded password pool. Refuses with 503 instead of
+    queueing without limit when a burst of logins is already waiting.
+    """
+    stats = password_check_stats
+    if stats.pending >= settings.PASSWORD_CHECK_MAX_PENDING:
+        stats.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    stats.pending += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _password_executor, verify_password, plain_password, hashed_password
+        )
+    finally:
+        stats.pending -= 1
+        # Includes time queued behind other checks, which is what callers feel
+        stats.record(time.perf_counter() - start)
+
+
 # -------------------------
 # JWT helpers
 # -------------------------
@@ -58,6 +128,8 @@ def create_access_token(
     data: dict,
     expires_delta: Optional[timedelta] = None,
 ) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
 
     expire = (
@@ -71,13 +143,73 @@ def create_access_token(
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# -------------------------
+# Verified token cache
+# -------------------------
+class CachedPrincipal:
+    __slots__ = ("admin", "expires_at")
+
+    def __init__(self, admin: Admin, expires_at: float):
+        self.admin = admin
+        self.expires_at = expires_at
+
+
+# Keyed by token hash so raw tokens are never held in memory
+_principals: "OrderedDict[str, CachedPrincipal]" = OrderedDict()
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def cached_principal(key: str) -> Optional[Admin]:
+    entry = _principals.get(key)
+    if entry is None:
+        return None
+    if entry.expires_at <= time.time():
+        del _principals[key]
+        return None
+    _principals.move_to_end(key)
+    return entry.admin
+
+
+def cache_principal(key: str, admin: Admin, exp: float) -> None:
+    # Never past the token's own expiry; the TTL bounds how long a
+    # revocation made elsewhere (another instance) can go unnoticed
+    expires_at = min(exp, time.time() + settings.AUTH_CACHE_TTL)
+    _principals[key] = CachedPrincipal(admin, expires_at)
+    _principals.move_to_end(key)
+    while len(_principals) > settings.AUTH_CACHE_MAX_ENTRIES:
+        _principals.popitem(last=False)
+
+
+def invalidate_admin_tokens(username: str) -> None:
+    for key in [key for key, entry in _principals.items() if entry.admin.username == username]:
+        del _principals[key]
+
+
+async def revoke_tokens(session: AsyncSession, admin: Admin) -> None:
+    """Invalidate every token issued to `admin` so far."""
+    admin.token_version += 1
+    session.add(admin)
+    await session.commit()
+    invalidate_admin_tokens(admin.username)
+
+
 # -------------------------
 # Auth dependency
 # -------------------------
-def get_current_admin(
+async def get_current_admin(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Admin:
+    key = token_key(token)
+    admin = cached_principal(key)
+    if admin:
+        return admin
+
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -92,11 +224,15 @@ def get_current_admin(
     except JWTError:
         raise credentials_exception
 
-    admin = session.exec(
+    admin = (await session.exec(
         select(Admin).where(Admin.username == username)
-    ).first()
+    )).first()
 
-    if not admin:
+    # Tokens issued before the last revocation carry an older version
+    if not admin or payload.get("ver", 0) != admin.token_version:
         raise credentials_exception
 
-    return admin
+    # Cache a detached copy, the session is closed after this request
+    principal = Admin.model_validate(admin)
+    cache_principal(key, principal, payload["exp"])
+    return principal
@@ -0,0 +1,433 @@
+"""
+In-process API benchmark with synthetic data and regression gates.
+
+Runs main.app through httpx's ASGI transport (no network, no server
+process) against a throwaway SQLite database, or any DATABASE_URL given
+with --database-url. The run has three steps:
+1. Seed projects with background images, technologies, calendar events and a
+   large resume through the API itself.
+2. Drive every public and admin route.
+3. Report latency (p50/p99), throughput, SQL statements per request and
+   peak RSS.
+
+Run from the backend directory (needs httpx):
+
+    python benchmarks/api.py
+    python benchmarks/api.py --save benchmarks/api_baseline.json
+    python benchmarks/api.py --baseline benchmarks/api_baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+# -------------------------
+# Environment
+# -------------------------
+def configure_environment(args) -> None:
+    """Point the app at a scratch database and blob store before it is imported."""
+    scratch = Path(tempfile.mkdtemp(prefix="portfolio-bench-"))
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{scratch / 'bench.db'}"
+    os.environ["BLOB_STORE_DIR"] = str(scratch / "blobs")
+    os.environ["ADMIN_USERNAME"] = "bench"
+    os.environ["ADMIN_PASSWORD"] = "bench-password"
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    # One instance only; background polls would show up in the query counts
+    os.environ["VERSION_POLL_INTERVAL"] = "0"
+    # Keep the access log out of the measurements and the output
+    os.environ["LOG_LEVEL"] = "ERROR"
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs (macOS): fall back to the process-wide peak
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Samples RSS in the background; `peak` is the maximum since `reset()`."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def reset(self) -> None:
+        self.peak = rss_bytes()
+
+    async def _run(self) -> None:
+        while True:
+            self.peak = max(self.peak, rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.reset()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+# -------------------------
+# Synthetic data
+# -------------------------
+def noise_png(target_bytes: int, rng: random.Random) -> bytes:
+    """A PNG of random pixels, which barely compresses, of roughly `target_bytes`."""
+    from PIL import Image
+
+    side = max(8, int((target_bytes / 3) ** 0.5))
+    image = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def resume_document(target_bytes: int, rng: random.Random) -> Dict[str, Any]:
+    words = ["design", "build", "ship", "scale", "measure", "lead", "api", "cache", "query", "deploy"]
+    document: Dict[str, Any] = {
+        "personalInfo": {"name": "Bench Mark", "title": "Engineer", "email": "bench@example.com"},
+        "experience": [],
+        "education": [{"school": "University", "degree": "BSc", "year": 2015}],
+        "skills": [f"skill-{i}" for i in range(50)],
+    }
+    size = 0
+    while size < target_bytes:
+        entry = {
+            "company": f"Company {len(document['experience'])}",
+            "role": "Engineer",
+            "start": "2018-01",
+            "end": "2020-12",
+            "highlights": [" ".join(rng.choice(words) for _ in range(20)) for _ in range(5)],
+        }
+        document["experience"].append(entry)
+        size += len(json.dumps(entry))
+    return document
+
+
+async def seed(client, headers: Dict[str, str], args, rng: random.Random) -> Dict[str, Any]:
+    async def check(response):
+        if response.status_code >= 400:
+            raise RuntimeError(f"Seeding failed: {response.request.method} {response.request.url} "
+                               f"{response.status_code} {response.text[:200]}")
+        return response
+
+    technologies = [{"title": f"Technology {i}"} for i in range(args.technologies)]
+    await check(await client.post("/api/v1/bulk/technologies", json=technologies, headers=headers))
+
+    project_ids = []
+    for i in range(args.projects):
+        tech_ids = rng.sample(range(1, args.technologies + 1), min(5, args.technologies))
+        response = await check(await client.post(
+            "/api/v1/projects/",
+            data={
+                "title": f"Project {i}",
+                "description": "Synthetic project " * 20,
+                "start_date": (date(2015, 1, 1) + timedelta(days=60 * i)).isoformat(),
+                "tags": "bench,synthetic",
+                "technology_ids": json.dumps(tech_ids),
+            },
+            files={"background_image": (f"p{i}.png", noise_png(args.image_bytes, rng), "image/png")},
+            headers=headers,
+        ))
+        project_ids.append(response.json()["id"])
+
+    events = []
+    for i in range(args.events):
+        start = date(2015, 1, 1) + timedelta(days=rng.randint(0, 15 * 365))
+        events.append({
+            "title": f"Event {i}",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.choice([0, 7, 30, 180]))).isoformat(),
+            "project_id": rng.choice(project_ids) if project_ids and rng.random() < 0.3 else None,
+        })
+    for start in range(0, len(events), 5000):
+        body = "\n".join(json.dumps(event) for event in events[start:start + 5000])
+        await check(await client.post(
+            "/api/v1/bulk/calendar",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        ))
+
+    resume = json.dumps(resume_document(args.resume_bytes, rng))
+    await check(await client.post("/api/v1/resume/", json={"content": resume}, headers=headers))
+    await check(await client.get("/api/v1/settings/"))
+
+    return {"project_ids": project_ids, "event_count": args.events}
+
+
+# -------------------------
+# Cases
+# -------------------------
+class Case:
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: Callable[[random.Random], str],
+        admin: bool = False,
+        requests: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.admin = admin
+        self.requests = requests
+        self.concurrency = concurrency
+        self.kwargs = kwargs
+
+
+def build_cases(seeded: Dict[str, Any]) -> List[Case]:
+    project_ids = seeded["project_ids"] or [1]
+    event_ids = range(1, seeded["event_count"] + 1)
+
+    def fixed(path: str) -> Callable[[random.Random], str]:
+        return lambda rng: path
+
+    def calendar_window(rng: random.Random) -> str:
+        start = date(2015, 1, 1) + timedelta(days=rng.randint(0, 14 * 365))
+        return f"/api/v1/calendar/timeline?from={start}&to={start + timedelta(days=365)}"
+
+    def calendar_row(rng: random.Random) -> Dict[str, Any]:
+        start = date(2016, 1, 1) + timedelta(days=rng.randint(0, 3650))
+        return {"title": "Updated", "start_date": start.isoformat()}
+
+    return [
+        # Public
+        Case("bootstrap", "GET", fixed("/api/v1/bootstrap/")),
+        Case("projects", "GET", fixed("/api/v1/projects/")),
+        Case("project_background", "GET",
+             lambda rng: f"/api/v1/projects/{rng.choice(project_ids)}/background"),
+        Case("project_background_variant", "GET",
+             lambda rng: f"/api/v1/projects/{rng.choice(project_ids)}/background?w=640",
+             headers={"Accept": "image/avif,image/webp,*/*"}),
+        Case("technologies", "GET", fixed("/api/v1/technologies/")),
+        Case("about", "GET", fixed("/api/v1/about/")),
+        Case("calendar", "GET", fixed("/api/v1/calendar/")),
+        Case("calendar_page", "GET", fixed("/api/v1/calendar/?from=2018-01-01&to=2020-12-31&limit=100")),
+        Case("calendar_timeline", "GET", calendar_window),
+        Case("resume", "GET", fixed("/api/v1/resume/"), headers={"Accept-Encoding": "gzip"}),
+        Case("resume_document", "GET", fixed("/api/v1/resume/document"), headers={"Accept-Encoding": "br, gzip"}),
+        Case("resume_section", "GET", fixed("/api/v1/resume/sections/experience"), headers={"Accept-Encoding": "gzip"}),
+        Case("settings", "GET", fixed("/api/v1/settings/")),
+        Case("metrics", "GET", fixed("/api/v1/metrics")),
+        # Admin; bcrypt is slow by design, so logins are few and sequential
+        Case("login", "POST", fixed("/api/v1/auth/token"), requests=10, concurrency=1,
+             data={"username": "bench", "password": "bench-password"}),
+        Case("calendar_update", "PUT", lambda rng: f"/api/v1/calendar/{rng.choice(event_ids)}",
+             admin=True, json=calendar_row),
+        Case("project_update", "PUT", lambda rng: f"/api/v1/projects/{rng.choice(project_ids)}",
+             admin=True, requests=50,
+             data=lambda rng: {"technology_ids": ",".join(map(str, rng.sample(range(1, 11), 4)))}),
+        Case("bulk_import_calendar", "POST", fixed("/api/v1/bulk/calendar"), admin=True, requests=10,
+             json=lambda rng: [calendar_row(rng) for _ in range(500)]),
+        Case("bulk_export_calendar", "GET", fixed("/api/v1/bulk/calendar"), admin=True, requests=10),
+    ]
+
+
+# -------------------------
+# Runner
+# -------------------------
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_case(
+    client, case: Case, headers, requests: int, concurrency: int, warmup: int, counter, sampler
+) -> Dict[str, Any]:
+    rng = random.Random(case.name)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(remaining):
+        nonlocal errors
+        for _ in remaining:
+            kwargs = {
+                key: value(rng) if callable(value) else value
+                for key, value in case.kwargs.items()
+            }
+            request_headers = {**kwargs.pop("headers", {}), **(headers if case.admin else {})}
+            start = time.perf_counter()
+            response = await client.request(case.method, case.path(rng), headers=request_headers, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    # Warm caches and lazily built indexes outside the measurement
+    await worker(range(warmup))
+    latencies.clear()
+    errors = 0
+
+    sampler.reset()
+    queries_before = counter["statements"]
+    remaining = iter(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(remaining) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "queries_per_request": round((counter["statements"] - queries_before) / requests, 2),
+        "peak_rss_mb": round(sampler.peak / 2**20, 1),
+    }
+
+
+async def benchmark(args) -> Dict[str, Any]:
+    import httpx
+    from sqlalchemy import event
+
+    import main
+    from create_admin import create_admin
+    from sessions import async_engine
+
+    counter = {"statements": 0}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        counter["statements"] += 1
+
+    rng = random.Random(args.seed)
+    sampler = RssSampler()
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        # Tables exist once startup has run
+        with contextlib.redirect_stdout(sys.stderr):
+            create_admin("bench", "bench-password")
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            token = (await client.post(
+                "/api/v1/auth/token", data={"username": "bench", "password": "bench-password"}
+            )).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            started = time.perf_counter()
+            seeded = await seed(client, headers, args, rng)
+            seed_seconds = time.perf_counter() - started
+
+            sampler.start()
+            cases = {}
+            try:
+                for case in build_cases(seeded):
+                    if args.only and case.name not in args.only:
+                        continue
+                    cases[case.name] = await run_case(
+                        client, case, headers,
+                        case.requests or args.requests,
+                        case.concurrency or args.concurrency,
+                        min(args.warmup, case.requests or args.warmup),
+                        counter, sampler,
+                    )
+                    print(f"{case.name:28} {cases[case.name]}", file=sys.stderr)
+            finally:
+                await sampler.stop()
+
+    return {
+        "config": {
+            key: getattr(args, key)
+            for key in ("projects", "image_bytes", "technologies", "events", "resume_bytes",
+                        "requests", "concurrency", "warmup", "seed")
+        },
+        "database": async_engine.dialect.name,
+        "seed_seconds": round(seed_seconds, 2),
+        "peak_rss_mb": round(max(case["peak_rss_mb"] for case in cases.values()), 1) if cases else 0.0,
+        "cases": cases,
+    }
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], args) -> List[str]:
+    failures = []
+    if result["config"] != baseline.get("config"):
+        print("[WARN] data/load settings differ from the baseline; comparison may be meaningless")
+
+    for name, current in result["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            continue
+        limit = previous["p99_ms"] * (1 + args.latency_tolerance)
+        if current["p99_ms"] > limit and current["p99_ms"] - previous["p99_ms"] > args.min_latency_delta:
+            failures.append(f"{name}: p99 {current['p99_ms']:.1f} ms > {limit:.1f} ms")
+        # Extra statements are a regression however fast they are today
+        if current["queries_per_request"] > previous["queries_per_request"] + args.query_tolerance:
+            failures.append(
+                f"{name}: {current['queries_per_request']} queries/request "
+                f"(baseline {previous['queries_per_request']})"
+            )
+        if current["errors"] > previous["errors"]:
+            failures.append(f"{name}: {current['errors']} errors (baseline {previous['errors']})")
+
+    rss_limit = baseline["peak_rss_mb"] * (1 + args.rss_tolerance)
+    if result["peak_rss_mb"] > rss_limit:
+        failures.append(f"peak RSS {result['peak_rss_mb']} MB > {rss_limit:.1f} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a scratch SQLite file")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--image-bytes", type=int, default=256 * 1024, help="background image size")
+    parser.add_argument("--technologies", type=int, default=100)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--resume-bytes", type=int, default=512 * 1024)
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per route")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="run only these cases")
+    parser.add_argument("--save", help="write the result as a baseline file")
+    parser.add_argument("--baseline", help="fail on regressions against this baseline file")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="allowed p99 slowdown")
+    parser.add_argument("--min-latency-delta", type=float, default=5.0, help="p99 ms differences treated as noise")
+    parser.add_argument("--rss-tolerance", type=float, default=0.2, help="allowed peak RSS growth")
+    parser.add_argument("--query-tolerance", type=float, default=0.0, help="allowed extra queries/request")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    result = asyncio.run(benchmark(args))
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline:
+        failures = compare(result, json.loads(Path(args.baseline).read_text()), args)
+        for failure in failures:
+            print(f"[FAIL] {failure}")
+        if failures:
+            sys.exit(1)
+        print("[OK] no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
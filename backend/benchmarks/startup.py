@@ -0,0 +1,102 @@
+"""
+Time-to-first-response benchmark for cold starts.
+
+Starts the app with uvicorn in a fresh process, polls a public route until
+it answers 200, and reports the wall time together with the in-process
+phase breakdown from /api/v1/health/startup. Run from the backend directory
+against the database configured in .env:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --runs 5 --save benchmarks/startup_baseline.json
+    python benchmarks/startup.py --runs 5 --baseline benchmarks/startup_baseline.json
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str, timeout: float = 5.0) -> bytes:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def measure(path: str, timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"no response from {path} within {timeout}s")
+            try:
+                get(base + path)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        first_response = time.perf_counter() - started
+        report = json.loads(get(base + "/api/v1/health/startup"))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {"first_response_ms": round(first_response * 1000, 2), "server": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", default="/api/v1/bootstrap/", help="route that must answer first")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per run")
+    parser.add_argument("--save", help="write the result as a baseline file")
+    parser.add_argument("--baseline", help="fail if slower than this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = parser.parse_args()
+
+    runs = [measure(args.path, args.timeout) for _ in range(args.runs)]
+    times = [run["first_response_ms"] for run in runs]
+    median = statistics.median(times)
+    result = {
+        "path": args.path,
+        "runs": len(runs),
+        "first_response_ms": {"median": median, "min": min(times), "max": max(times)},
+        # Phase breakdown of the run closest to the median
+        "server": min(runs, key=lambda run: abs(run["first_response_ms"] - median))["server"],
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["first_response_ms"]["median"]
+        limit = baseline * (1 + args.tolerance)
+        if median > limit:
+            print(f"[FAIL] median {median:.1f} ms exceeds baseline {baseline:.1f} ms (+{args.tolerance:.0%})")
+            sys.exit(1)
+        print(f"[OK] median {median:.1f} ms within baseline {baseline:.1f} ms (+{args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Content-addressed storage for uploaded images.
+
+Blobs are keyed by the SHA-256 of their content, so identical uploads are
+stored once. The database only keeps the hash plus a `Blob` metadata row;
+the bytes live in the configured store and are streamed from there.
+Uploads are staged in chunks: hashed, size-checked and written to a temp
+file as they are read, then moved into the store under their hash.
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Tuple
+
+from fastapi import HTTPException, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import settings
+from models import Blob
+
+
+CHUNK_SIZE = 64 * 1024
+# Room for boundaries, part headers and the text fields of upload forms
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# -------------------------
+# Store backends
+# -------------------------
+class BlobStore(ABC):
+    """Interface every blob store backend implements."""
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        ...
+
+    def staging_dir(self) -> Path:
+        """Where uploads are staged before `put_file`."""
+        return Path(tempfile.gettempdir())
+
+    def put_file(self, key: str, path: Path) -> None:
+        """Store the file at `path` (whose hash is `key`); `path` is consumed."""
+        self.put(path.read_bytes())
+        path.unlink(missing_ok=True)
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        ...
+
+    def path(self, key: str) -> Optional[Path]:
+        """Local filesystem path for zero-copy responses, if the backend has one."""
+        return None
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Stores blobs as files under `root`, fanned out by hash prefix."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def put(self, data: bytes) -> str:
+        key = content_hash(data)
+        target = self._path(key)
+        if target.exists():
+            return key
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so readers never see a partial blob
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, target)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return key
+
+    def staging_dir(self) -> Path:
+        # Same filesystem as the blobs, so put_file is an atomic rename
+        staging = self.root / ".staging"
+        staging.mkdir(exist_ok=True)
+        return staging
+
+    def put_file(self, key: str, path: Path) -> None:
+        target = self._path(key)
+        if target.exists():
+            path.unlink(missing_ok=True)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError:
+            # Staging on another device, fall back to a copy
+            shutil.move(str(path), target)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def read(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    def path(self, key: str) -> Optional[Path]:
+        target = self._path(key)
+        return target if target.exists() else None
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+BACKENDS = {
+    "local": lambda: LocalBlobStore(settings.BLOB_STORE_DIR),
+}
+
+
+@lru_cache
+def get_blob_store() -> BlobStore:
+    try:
+        factory = BACKENDS[settings.BLOB_STORE_BACKEND]
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown BLOB_STORE_BACKEND '{settings.BLOB_STORE_BACKEND}'"
+        )
+    return factory()
+
+
+# -------------------------
+# Chunked uploads
+# -------------------------
+class StagedUpload:
+    """An upload written to a temp file, with what was learned while reading it."""
+
+    def __init__(self, path: Path, key: str, size: int, content_type: Optional[str]):
+        self.path = path
+        self.key = key
+        self.size = size
+        self.content_type = content_type
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def stage_file(
+    source: BinaryIO,
+    max_bytes: int,
+    sniff: Callable[[bytes], Optional[str]],
+) -> StagedUpload:
+    """
+    Copy `source` to a staging file in CHUNK_SIZE pieces, hashing as it goes.
+    The type is sniffed from the first chunk and reading stops early if it
+    is not recognised (content_type None) or the size exceeds `max_bytes`.
+    """
+    fd, name = tempfile.mkstemp(dir=get_blob_store().staging_dir())
+    path = Path(name)
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    try:
+        with os.fdopen(fd, "wb") as staged:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0:
+                    content_type = sniff(chunk)
+                    if content_type is None:
+                        break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                staged.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return StagedUpload(path, digest.hexdigest(), size, content_type)
+
+
+async def stage_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    sniff: Callable[[bytes], Optional[str]],
+) -> StagedUpload:
+    # The multipart parser already knows the size; reject without reading
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+    await upload.seek(0)
+    # One worker thread for the whole copy instead of a hop per chunk
+    return await run_in_threadpool(stage_file, upload.file, max_bytes, sniff)
+
+
+# -------------------------
+# Request size limit
+# -------------------------
+class UploadLimitMiddleware:
+    """
+    Rejects multipart bodies larger than one upload before they are parsed.
+
+    The form parser spools every file to disk before the endpoint runs, so
+    stage_upload alone only sees oversized uploads after they were received.
+    A Content-Length over the limit is refused without reading the body; a
+    chunked body is counted as it is received and aborted once it passes.
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def limit(self) -> int:
+        max_bytes = self.max_bytes if self.max_bytes is not None else settings.UPLOAD_MAX_BYTES
+        return max_bytes + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/"):
+            return await self.app(scope, receive, send)
+
+        limit = self.limit()
+        too_large = HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            response = ORJSONResponse({"detail": too_large.detail}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing, answered by the exception handlers
+                    raise too_large
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# -------------------------
+# DB helpers
+# -------------------------
+async def store_blob(
+    session: AsyncSession,
+    data: bytes,
+    content_type: Optional[str] = None,
+) -> Blob:
+    """Persist `data` in the blob store and make sure its metadata row exists."""
+    key = await run_in_threadpool(get_blob_store().put, data)
+    blob = await session.get(Blob, key)
+    if not blob:
+        blob = Blob(
+            hash=key,
+            size=len(data),
+            content_type=content_type or "application/octet-stream",
+        )
+        session.add(blob)
+    return blob
+
+
+async def store_staged(session: AsyncSession, staged: StagedUpload) -> Tuple[Blob, bool]:
+    """
+    Move a staged upload into the store, unless a blob with the same hash is
+    already there. Returns the metadata row and whether the blob is new.
+    """
+    store = get_blob_store()
+    blob = await session.get(Blob, staged.key)
+    if blob and await run_in_threadpool(store.exists, staged.key):
+        staged.discard()
+        return blob, False
+
+    await run_in_threadpool(store.put_file, staged.key, staged.path)
+    if not blob:
+        blob = Blob(
+            hash=staged.key,
+            size=staged.size,
+            content_type=staged.content_type or "application/octet-stream",
+        )
+        session.add(blob)
+    return blob, True
+
+
+async def read_blob(key: Optional[str]) -> Optional[bytes]:
+    store = get_blob_store()
+    if key and store.exists(key):
+        return await run_in_threadpool(store.read, key)
+    return None
+
+
+def blob_response(
+    key: Optional[str],
+    content_type: Optional[str] = None,
+) -> Optional[Response]:
+    """
+    Stream a stored blob, or return None when it is not in the store yet
+    (e.g. legacy rows that migrate_blobs.py has not moved).
+    """
+    if not key:
+        return None
+
+    store = get_blob_store()
+    media_type = content_type or "application/octet-stream"
+    path = store.path(key)
+    if path:
+        return FileResponse(path, media_type=media_type)
+    if store.exists(key):
+        return Response(content=store.read(key), media_type=media_type)
+    return None
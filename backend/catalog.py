@@ -0,0 +1,83 @@
+"""
+In-memory catalog of technologies: id, title and image hash only.
+
+Project writes validate and link technology ids against it instead of
+loading Technology rows (and their legacy image BLOBs). The catalog is
+rebuilt from one query whenever the "technologies" version has moved, i.e.
+after any technology write; ids it does not know yet (e.g. created by
+another instance) are looked up in one batched IN query.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Technology
+from versions import get_version
+
+COLLECTION = "technologies"
+COLUMNS = (Technology.id, Technology.title, Technology.image_hash)
+
+
+class CatalogEntry:
+    __slots__ = ("id", "title", "image_hash")
+
+    def __init__(self, id: int, title: str, image_hash: Optional[str]):
+        self.id = id
+        self.title = title
+        self.image_hash = image_hash
+
+
+class TechnologyCatalog:
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._load_lock = asyncio.Lock()
+        self.reloads = 0
+        self.lookups = 0
+
+    def is_current(self) -> bool:
+        return self.version == get_version(COLLECTION).version
+
+    async def ensure_current(self, session: AsyncSession) -> None:
+        if self.is_current():
+            return
+        async with self._load_lock:
+            if self.is_current():
+                return
+            version = get_version(COLLECTION).version
+            rows = (await session.exec(select(*COLUMNS))).all()
+            self._entries = {row.id: CatalogEntry(*row) for row in rows}
+            self.version = version
+            self.reloads += 1
+
+    async def resolve(
+        self,
+        session: AsyncSession,
+        ids: Iterable[int],
+    ) -> Tuple[Dict[int, CatalogEntry], List[int]]:
+        """Split `ids` into known entries and the ids that do not exist."""
+        await self.ensure_current(session)
+        wanted = list(dict.fromkeys(ids))
+        unknown = [tech_id for tech_id in wanted if tech_id not in self._entries]
+        if unknown:
+            self.lookups += 1
+            rows = (await session.exec(select(*COLUMNS).where(Technology.id.in_(unknown)))).all()
+            for row in rows:
+                self._entries[row.id] = CatalogEntry(*row)
+        found = {tech_id: self._entries[tech_id] for tech_id in wanted if tech_id in self._entries}
+        return found, [tech_id for tech_id in wanted if tech_id not in found]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "version": self.version,
+            "current": self.is_current(),
+            "reloads": self.reloads,
+            "lookups": self.lookups,
+        }
+
+
+technology_catalog = TechnologyCatalog()
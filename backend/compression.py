@@ -0,0 +1,105 @@
+"""
+Compressed response bodies.
+
+Large payloads that change rarely are compressed when they are first
+served in a coding and cached until their collection changes, instead of
+on every request; the coding is picked from the client's Accept-Encoding. Brotli is optional: without the
+`brotli` package only gzip variants are produced.
+"""
+
+import gzip
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from config import settings
+
+# Server preference when the client accepts several encodings equally
+PREFERRED = ("br", "gzip")
+
+
+@lru_cache(maxsize=None)
+def brotli_module():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def available_codings() -> Tuple[str, ...]:
+    return PREFERRED if brotli_module() is not None else ("gzip",)
+
+
+def encode(body: bytes, coding: str) -> Optional[bytes]:
+    """
+    `body` encoded with `coding`, or None when it is below COMPRESS_MIN_BYTES
+    or would not get smaller. Uses the moderate COMPRESS_*_LEVEL settings,
+    as bodies are encoded on the request path. CPU bound: call through
+    run_in_threadpool for large bodies.
+    """
+    if len(body) < settings.COMPRESS_MIN_BYTES:
+        return None
+    if coding == "gzip":
+        data = gzip.compress(body, compresslevel=settings.COMPRESS_GZIP_LEVEL, mtime=0)
+    elif coding == "br" and brotli_module() is not None:
+        data = brotli_module().compress(body, quality=settings.COMPRESS_BROTLI_QUALITY)
+    else:
+        return None
+    return data if len(data) < len(body) else None
+
+
+def parse_accept(header: str) -> Dict[str, float]:
+    """Items of an Accept or Accept-Encoding header, lowercased, with their q-values."""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate(request: Request, available: Iterable[str]) -> Optional[str]:
+    """The best coding in `available` the client accepts, or None for identity."""
+    header = request.headers.get("accept-encoding")
+    if not header:
+        return None
+    accepted = parse_accept(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in PREFERRED:
+        if coding not in available:
+            continue
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def encoded_response(
+    body: bytes,
+    coding: Optional[str],
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if coding:
+        headers["Content-Encoding"] = coding
+        # The encoded bytes differ from the identity ones, so the strong
+        # validator becomes weak (If-None-Match compares weakly anyway)
+        etag = headers.pop("etag", None) or headers.pop("ETag", None)
+        if etag:
+            headers["ETag"] = etag if etag.startswith("W/") else f"W/{etag}"
+    return Response(content=body, media_type=media_type, headers=headers)
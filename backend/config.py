@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -6,8 +7,56 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Verified tokens are trusted for at most this long before re-checking the DB
+    AUTH_CACHE_TTL: int = 300 # seconds
+    AUTH_CACHE_MAX_ENTRIES: int = 1024
+    # Login: bcrypt worker pool and failed-attempt throttling
+    PASSWORD_CHECK_WORKERS: int = 2
+    PASSWORD_CHECK_MAX_PENDING: int = 8
+    LOGIN_MAX_FAILURES_PER_IP: int = 20
+    LOGIN_MAX_FAILURES_PER_USER: int = 5
+    LOGIN_FAILURE_WINDOW: int = 900 # seconds
     ADMIN_USERNAME: str
     ADMIN_PASSWORD: str
+    # Async connection pool; recycle below the server's idle timeout
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 30 # seconds
+    DB_POOL_RECYCLE: int = 1800 # seconds
+    DB_LIVENESS_INTERVAL: int = 60 # seconds, 0 disables
+    DB_POOL_PREWARM: int = 2 # connections opened at startup, 0 disables
+    # SQLite profile, applied to every connection of a sqlite:// DATABASE_URL
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT: int = 5000 # ms a writer waits for the write lock
+    # How often each instance checks for writes made by other instances, 0 disables
+    VERSION_POLL_INTERVAL: float = 2.0 # seconds
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_DIR: str = "blobs"
+    # Cache-Control per route group (collection name or "images"), JSON in env
+    CACHE_CONTROL_DEFAULT: str = "public, no-cache"
+    CACHE_CONTROL_POLICIES: Dict[str, str] = {"images": "public, max-age=300"}
+    # Upload-time image variants: size name -> max width, formats by preference
+    IMAGE_VARIANT_WIDTHS: Dict[str, int] = {"thumb": 160, "card": 640, "full": 1600}
+    IMAGE_VARIANT_FORMATS: List[str] = ["avif", "webp"]
+    IMAGE_VARIANT_CACHE_ENTRIES: int = 1024 # images whose variant list is kept in memory
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_TTL: int = 600 # seconds
+    # Bodies at least this large are served gzip/brotli encoded when accepted
+    COMPRESS_MIN_BYTES: int = 1024
+    # Levels for bodies compressed on the request path (once per version
+    # and coding, then served from the response cache)
+    COMPRESS_GZIP_LEVEL: int = 6
+    COMPRESS_BROTLI_QUALITY: int = 5
+    # Bulk import limits per request
+    BULK_MAX_ROWS: int = 10000
+    BULK_MAX_BYTES: int = 16 * 1024 * 1024
+    # Access log: "json" or "text"; successful requests are sampled
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_SLOW_REQUEST_MS: int = 1000
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,12 @@
 import os
-from sqlmodel import SQLModel, create_engine
+import ssl
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, exc, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from sqlmodel import SQLModel, Session, create_engine, select, update
 from config import settings
 
 # DATABASE_URL = os.getenv("DATABASE_URL")
@@ -8,18 +15,225 @@ DATABASE_URL = settings.DATABASE_URL
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
-# For Aiven MySQL with pymysql
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={
-        "ssl": {
-            "ssl_ca": "/etc/ssl/certs/ca-certificates.crt",
-            "ssl_verify_cert": True
-        }
-    },
-    echo=False,
-    pool_pre_ping=True,
+# -------------------------
+# Engine factory
+# -------------------------
+CA_BUNDLE = "/etc/ssl/certs/ca-certificates.crt"
+
+# Async drivers for the request path (see sessions.py); the sync engine
+# below is kept for startup schema work and the CLI scripts
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def connect_args_for(url) -> Dict[str, Any]:
+    """DBAPI connect() arguments for the backend and driver of `url`."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "mysql":
+        # Aiven requires TLS; aiomysql takes an SSLContext, pymysql a dict
+        if url.get_driver_name() == "aiomysql":
+            return {"ssl": ssl.create_default_context(cafile=CA_BUNDLE)}
+        return {"ssl": {"ssl_ca": CA_BUNDLE, "ssl_verify_cert": True}}
+    if backend == "sqlite":
+        # Pooled connections are used by whichever thread checks them out;
+        # the pool never shares one between threads at the same time
+        return {"check_same_thread": False}
+    return {}
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Profile for serving reads from a local file: WAL lets readers run
+    alongside the single writer, synchronous=NORMAL only syncs at WAL
+    checkpoints (still safe against corruption), and mmap/cache/temp_store
+    keep hot pages and sort buffers in memory.
+    """
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        # Negative values are KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+    }
+
+def configure_engine(sync_engine: Engine) -> Engine:
+    """Per-connection setup; pass `async_engine.sync_engine` for async engines."""
+    if sync_engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas()
+
+        @event.listens_for(sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return sync_engine
+
+def create_db_engine(url) -> Engine:
+    engine = create_engine(
+        url,
+        connect_args=connect_args_for(url),
+        echo=False,
+        pool_pre_ping=True,
+    )
+    return configure_engine(engine)
+
+engine = create_db_engine(DATABASE_URL)
+
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_connect_args = connect_args_for(ASYNC_DATABASE_URL)
+
+def sync_columns():
+    """
+    create_all() only creates missing tables, so columns added to existing
+    models are appended here, and columns relaxed to nullable are altered
+    (MySQL only). New columns must be nullable or carry a server default.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                if column.name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                elif (
+                    engine.dialect.name == "mysql"
+                    and column.nullable
+                    and not existing[column.name]["nullable"]
+                ):
+                    conn.execute(text(f"ALTER TABLE {table.name} MODIFY COLUMN {ddl}"))
+
+def sync_indexes():
+    """create_all() only indexes the tables it creates; add new indexes here."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+
+def backfill_image_metadata():
+    """Fill size/hash columns for background images stored before they existed."""
+    from models import Project
+
+    with Session(engine) as session:
+        pending = session.exec(
+            select(Project.id).where(
+                Project.background_image.is_not(None),
+                Project.background_hash.is_(None),
+            )
+        ).all()
+
+        # One image at a time so memory stays bounded by the largest image
+        for project_id in pending:
+            image = session.exec(
+                select(Project.background_image).where(Project.id == project_id)
+            ).one()
+            session.exec(
+                update(Project)
+                .where(Project.id == project_id)
+                .values(
+                    background_size=len(image),
+                    background_hash=hashlib.sha256(image).hexdigest(),
+                )
+            )
+        session.commit()
+
+def backfill_resume_sections():
+    """Split a resume stored as a single document into its section rows."""
+    import orjson
+    from models import Resume, ResumeSection
+    from resume_sections import OTHER, split_sections
+
+    with Session(engine) as session:
+        stored = set(session.exec(select(ResumeSection.name)).all())
+        if OTHER in stored:
+            return
+        content = session.exec(select(Resume.content)).first()
+        if content is None:
+            return
+        try:
+            document = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return
+        if not isinstance(document, dict):
+            return
+        # Rows written before OTHER existed were kept in step with the document
+        session.add_all(
+            ResumeSection(name=name, content=section)
+            for name, section in split_sections(document).items()
+            if section is not None and name not in stored
+        )
+        session.commit()
+
+# Fingerprint of the schema the models describe, recorded after the schema
+# work below succeeds. Kept out of SQLModel.metadata so it is not part of
+# its own fingerprint.
+schema_stamp = Table(
+    "schema_stamp",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
 )
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+def schema_fingerprint() -> str:
+    import models  # noqa: F401, registers every table
+
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+def stored_fingerprint() -> Optional[str]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                schema_stamp.select().with_only_columns(schema_stamp.c.fingerprint)
+            ).scalar()
+    except exc.DBAPIError:
+        # No stamp table yet, first boot with this code
+        return None
+
+def write_stamp(fingerprint: str):
+    schema_stamp.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(schema_stamp.delete())
+        conn.execute(schema_stamp.insert().values(
+            id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()
+        ))
+
+def create_db_and_tables(force: bool = False) -> bool:
+    """
+    Create and migrate the schema, unless the stamp shows it already matches
+    the models (one query instead of a metadata scan of every table).
+    Returns whether the schema work ran.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and stored_fingerprint() == fingerprint:
+        return False
+    SQLModel.metadata.create_all(engine)
+    sync_columns()
+    sync_indexes()
+    backfill_image_metadata()
+    backfill_resume_sections()
+    write_stamp(fingerprint)
+    return True
@@ -0,0 +1,272 @@
+"""
+Script to pre-render the public API into static files (e.g. for GitHub Pages).
+Run manually after admin edits; only files whose content changed are rewritten.
+
+    python export_snapshot.py --out ../snapshot --base-url https://ms16dev.github.io/snapshot/
+
+Layout of the output directory:
+
+    manifest.json           snapshot version, image variants, every file's hash
+    data/<route>.json       one file per public GET (and bootstrap.json)
+    images/<sha256>.<ext>   originals and variants, content addressed
+
+Image URLs inside the JSON point at the static copies (the full-size WebP
+variant when there is one), so serving the snapshot needs no backend.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import orjson
+from fastapi import Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from blobstore import read_blob
+from database import create_db_and_tables
+from models import About, Blob, ImageVariant, Project, Technology
+from response_cache import serialize
+from routers.bootstrap import SECTIONS
+from resume_sections import SECTIONS as RESUME_SECTIONS
+from routers.resume import load_document, load_section
+from routers.technologies import build_technology_list
+from sessions import async_engine
+
+# Static image format used for URLs in the JSON; every variant is exported
+STATIC_IMAGE_FORMAT = "webp"
+STATIC_IMAGE_LABEL = "full"
+
+EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/avif": "avif",
+    "image/bmp": "bmp",
+    "image/svg+xml": "svg",
+    "image/x-icon": "ico",
+}
+
+VERSIONED_URL = re.compile(r"\?v=([0-9a-f]{16})$")
+
+
+def snapshot_request() -> Request:
+    # Builders only read base_url from the request, and every URL they
+    # produce is rewritten to a static path below
+    return Request({
+        "type": "http",
+        "scheme": "http",
+        "server": ("snapshot", 80),
+        "root_path": "",
+        "path": "/",
+        "headers": [],
+        "query_string": b"",
+    })
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# -------------------------
+# Images
+# -------------------------
+async def collect_images(session: AsyncSession) -> Dict[str, Dict[str, Any]]:
+    """Every image referenced by a public row, keyed by its hash prefix (the `?v=`)."""
+    hashes = set()
+    for column in (About.avatar_hash, Technology.image_hash, Project.background_hash):
+        hashes.update(h for h in (await session.exec(select(column))).all() if h)
+
+    blobs = {
+        blob.hash: blob
+        for blob in (await session.exec(select(Blob).where(Blob.hash.in_(hashes)))).all()
+    }
+    variants = (await session.exec(
+        select(ImageVariant).where(ImageVariant.source_hash.in_(hashes))
+    )).all()
+
+    images = {}
+    for key in sorted(hashes):
+        blob = blobs.get(key)
+        if not blob:
+            print(f"[WARN] image {key[:16]} has no blob row, skipped")
+            continue
+        images[key[:16]] = {
+            "hash": key,
+            "content_type": blob.content_type,
+            "path": f"images/{key}.{EXTENSIONS.get(blob.content_type, 'bin')}",
+            "width": blob.width,
+            "height": blob.height,
+            "variants": [
+                {
+                    "label": v.label,
+                    "format": v.format,
+                    "width": v.width,
+                    "height": v.height,
+                    "hash": v.blob_hash,
+                    "path": f"images/{v.blob_hash}.{v.format}",
+                }
+                for v in sorted(variants, key=lambda v: (v.format, v.width))
+                if v.source_hash == key
+            ],
+        }
+    return images
+
+
+def static_image_path(image: Dict[str, Any]) -> str:
+    preferred = [v for v in image["variants"] if v["format"] == STATIC_IMAGE_FORMAT]
+    for variant in preferred:
+        if variant["label"] == STATIC_IMAGE_LABEL:
+            return variant["path"]
+    return preferred[-1]["path"] if preferred else image["path"]
+
+
+def rewrite_image_urls(content: Any, images: Dict[str, Dict[str, Any]], base_url: str) -> Any:
+    if isinstance(content, list):
+        return [rewrite_image_urls(item, images, base_url) for item in content]
+    if not isinstance(content, dict):
+        return content
+
+    result = {}
+    for key, value in content.items():
+        if key.endswith("_url") and isinstance(value, str) and value.startswith("http://snapshot/"):
+            match = VERSIONED_URL.search(value)
+            image = images.get(match.group(1)) if match else None
+            if image is None:
+                # Still only in a legacy BLOB column, run migrate_blobs.py first
+                print(f"[WARN] {value} is not in the blob store, left out")
+                value = None
+            else:
+                value = base_url + static_image_path(image)
+        result[key] = rewrite_image_urls(value, images, base_url)
+    return result
+
+
+# -------------------------
+# Documents
+# -------------------------
+async def build_documents(
+    session: AsyncSession,
+    images: Dict[str, Dict[str, Any]],
+    base_url: str,
+) -> Dict[str, bytes]:
+    request = snapshot_request()
+
+    sections = {
+        name: await section.build(request, session)
+        for name, section in SECTIONS.items()
+    }
+    # File names follow the API routes; the bootstrap "technologies" section
+    # is /about/technologies, /technologies/ itself is the id/title list
+    content: Dict[str, Any] = {
+        name: value for name, value in sections.items() if name not in ("technologies", "timeline")
+    }
+    content["about/technologies"] = sections["technologies"]
+    content["calendar/timeline"] = sections["timeline"]
+    content["technologies"] = await build_technology_list(session)
+    # /resume/document serves the stored JSON itself, which the frontend reads
+    content["resume/document"] = orjson.loads(await load_document(session))
+    for name in RESUME_SECTIONS:
+        content[f"resume/sections/{name}"] = orjson.loads(await load_section(session, name))
+    content["bootstrap"] = sections
+
+    return {
+        f"data/{route}.json": serialize(rewrite_image_urls(value, images, base_url))
+        for route, value in content.items()
+    }
+
+
+# -------------------------
+# Incremental write
+# -------------------------
+def load_manifest(out: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((out / "manifest.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return {"files": {}}
+
+
+def write_file(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+async def export_snapshot(out: Path, base_url: str) -> Dict[str, Any]:
+    create_db_and_tables()
+    previous = load_manifest(out).get("files", {})
+    files: Dict[str, str] = {}
+    counts = {"written": 0, "unchanged": 0, "removed": 0}
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        images = await collect_images(session)
+        documents = await build_documents(session, images, base_url)
+
+    for relative, data in sorted(documents.items()):
+        path = out / relative
+        digest = file_hash(data)
+        if previous.get(relative) == digest and path.exists():
+            counts["unchanged"] += 1
+        else:
+            write_file(path, data)
+            counts["written"] += 1
+        files[relative] = digest
+
+    for image in images.values():
+        for item in [image] + image["variants"]:
+            relative, digest = item["path"], item["hash"]
+            path = out / relative
+            # Content addressed, so an existing file is always current
+            if not path.exists():
+                data = await read_blob(digest)
+                if data is None:
+                    print(f"[WARN] blob {digest[:16]} missing from the blob store")
+                    continue
+                write_file(path, data)
+                counts["written"] += 1
+            else:
+                counts["unchanged"] += 1
+            files[relative] = digest
+
+    for relative in set(previous) - set(files):
+        (out / relative).unlink(missing_ok=True)
+        counts["removed"] += 1
+
+    version = file_hash("".join(f"{k}:{v};" for k, v in sorted(files.items())).encode())[:16]
+    manifest = {
+        "version": version,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "files": files,
+        "images": images,
+    }
+    write_file(out / "manifest.json", json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return {"version": version, **counts}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="snapshot", help="output directory")
+    parser.add_argument(
+        "--base-url",
+        default="",
+        help="URL the output directory is served from, prefixed to image URLs",
+    )
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if base_url and not base_url.endswith("/"):
+        base_url += "/"
+
+    result = asyncio.run(export_snapshot(Path(args.out), base_url))
+    print(
+        f"[SUCCESS] snapshot {result['version']}: {result['written']} written, "
+        f"{result['unchanged']} unchanged, {result['removed']} removed"
+    )
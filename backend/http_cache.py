@@ -0,0 +1,151 @@
+"""
+HTTP conditional caching for public GET routes.
+
+JSON routes get a strong ETag derived from the versions of the collections
+they read (see versions.py), so If-None-Match / If-Modified-Since can be
+answered with a 304 before a session is ever used. Image routes use the
+content hash as their ETag and are immutable when requested with `?v=`.
+"""
+
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from config import settings
+from versions import get_version
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def cache_policy(name: str) -> str:
+    return settings.CACHE_CONTROL_POLICIES.get(name, settings.CACHE_CONTROL_DEFAULT)
+
+
+def collection_etag(*collections: str) -> str:
+    # Versions live in the database, so every instance derives the same tag
+    key = ";".join(
+        f"{name}:{get_version(name).epoch}:{get_version(name).version}" for name in collections
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def collection_last_modified(*collections: str) -> datetime:
+    return max(get_version(name).last_modified for name in collections)
+
+
+# Characters of the content hash in image ETags and ?v= URL versions
+IMAGE_VERSION_LENGTH = 16
+
+
+def image_etag(key: str, label: Optional[str] = None) -> str:
+    # Variants of one image share the content-hash prefix
+    prefix = key[:IMAGE_VERSION_LENGTH]
+    return f'"{prefix}-{label}"' if label else f'"{prefix}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def is_not_modified(
+    request: Request,
+    etag: Optional[str],
+    last_modified: Optional[datetime] = None,
+) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return bool(etag) and etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and last_modified <= since
+
+    return False
+
+
+def validator_headers(
+    etag: Optional[str],
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+) -> Dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+# -------------------------
+# JSON routes
+# -------------------------
+def conditional(*collections: str, policy: Optional[str] = None):
+    """
+    Route dependency: raise a 304 when the client's copy of `collections` is
+    current, otherwise attach validators to the response.
+    """
+    policy_name = policy or collections[0]
+
+    async def check(request: Request, response: Response):
+        etag = collection_etag(*collections)
+        last_modified = collection_last_modified(*collections)
+        headers = validator_headers(etag, cache_policy(policy_name), last_modified)
+        if is_not_modified(request, etag, last_modified):
+            raise not_modified(headers)
+        response.headers.update(headers)
+
+    return Depends(check)
+
+
+# -------------------------
+# Image routes
+# -------------------------
+def is_image_version(version: Optional[str]) -> bool:
+    # Shorter prefixes are not specific to one content hash
+    return version is not None and len(version) == IMAGE_VERSION_LENGTH
+
+
+def image_headers(
+    key: Optional[str],
+    version: Optional[str],
+    label: Optional[str] = None,
+) -> Dict[str, str]:
+    etag = image_etag(key, label) if key else None
+    # A URL carrying the content hash can never change, cache it forever
+    if key and is_image_version(version) and key.startswith(version):
+        return validator_headers(etag, IMMUTABLE)
+    return validator_headers(etag, cache_policy("images"))
+
+
+def check_image_version(request: Request, version: Optional[str]) -> None:
+    """
+    Answer a revalidation of a content-addressed image URL without the DB:
+    any representation the client holds for that hash is still valid.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not is_image_version(version) or not if_none_match:
+        return
+    prefix = image_etag(version)[:-1]
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == prefix + '"' or tag.startswith(prefix + "-"):
+            headers = validator_headers(tag, IMMUTABLE)
+            headers["Vary"] = "Accept"
+            raise not_modified(headers)
@@ -0,0 +1,277 @@
+"""
+Upload-time image pipeline.
+
+Uploads are sniffed for their real format and stored as-is in the blob
+store; raster images additionally get resized variants (IMAGE_VARIANT_WIDTHS)
+in the configured formats. Image GETs pick the best variant for the `?w=`
+width hint and the client's Accept header.
+"""
+
+import io
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from blobstore import blob_response, get_blob_store, read_blob, stage_upload, store_blob, store_staged
+from compression import parse_accept
+from config import settings
+from http_cache import image_headers, is_not_modified, not_modified
+from models import Blob, ImageVariant
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+}
+
+# Formats Pillow can decode and we are willing to transcode
+RASTER_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/avif", "image/bmp"}
+
+ENCODER_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 55, "speed": 6},
+}
+
+
+# -------------------------
+# Format sniffing
+# -------------------------
+def sniff_content_type(data: bytes) -> Optional[str]:
+    head = data[:64]
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    if head.startswith(b"\x00\x00\x01\x00"):
+        return "image/x-icon"
+    text = head.lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in data[:1024].lower()):
+        return "image/svg+xml"
+    return None
+
+
+def legacy_content_type(data: bytes) -> str:
+    # Images stored in the legacy columns carry no content type of their own
+    return sniff_content_type(data) or "application/octet-stream"
+
+
+# Pillow is imported on first use, only uploads need it and it is slow to
+# import on a cold start
+def enabled_formats() -> List[str]:
+    from PIL import features
+
+    return [
+        fmt for fmt in settings.IMAGE_VARIANT_FORMATS
+        if fmt in CONTENT_TYPES and features.check(fmt)
+    ]
+
+
+# -------------------------
+# Upload path
+# -------------------------
+class EncodedVariant:
+    def __init__(self, label: str, fmt: str, width: int, height: int, data: bytes):
+        self.label = label
+        self.format = fmt
+        self.width = width
+        self.height = height
+        self.data = data
+
+
+async def store_image(session: AsyncSession, data: bytes) -> Blob:
+    """Store an uploaded image and generate its variants (once per content hash)."""
+    content_type = sniff_content_type(data)
+    if not content_type:
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    blob = await store_blob(session, data, content_type)
+    if content_type in RASTER_TYPES and blob.width is None:
+        await add_variants(session, blob, data)
+    return blob
+
+
+async def store_upload(session: AsyncSession, upload: UploadFile) -> Blob:
+    """
+    Stream an upload into the blob store, bounded by UPLOAD_MAX_BYTES. A
+    repeated upload is recognised by its hash and neither stored nor
+    transcoded again.
+    """
+    staged = await stage_upload(upload, settings.UPLOAD_MAX_BYTES, sniff_content_type)
+    try:
+        if not staged.content_type:
+            raise HTTPException(status_code=400, detail="Unsupported image format")
+        blob, _ = await store_staged(session, staged)
+    finally:
+        staged.discard()
+
+    if blob.content_type in RASTER_TYPES and blob.width is None:
+        # Decode from the stored file rather than holding the upload in memory
+        source = get_blob_store().path(blob.hash) or await read_blob(blob.hash)
+        if source is not None:
+            await add_variants(session, blob, source)
+    return blob
+
+
+async def add_variants(session: AsyncSession, blob: Blob, source: Union[bytes, Path]) -> None:
+    try:
+        # Decoding and encoding are CPU bound, keep them off the event loop
+        size, encoded = await run_in_threadpool(encode_variants, source, blob.size)
+    except Exception as e:
+        # The original is still served if transcoding fails
+        logger.warning(f"Image variants failed for {blob.hash}: {e}")
+    else:
+        blob.width, blob.height = size
+        await store_variants(session, blob, encoded)
+
+
+def encode_variants(
+    data: Union[bytes, Path],
+    original_size: int,
+) -> Tuple[Tuple[int, int], List[EncodedVariant]]:
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data) if isinstance(data, bytes) else data) as source:
+        size = source.size
+        if getattr(source, "is_animated", False):
+            # Keep animations as uploaded, variants would be single frames
+            return size, []
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        encoded = []
+        widths = sorted(settings.IMAGE_VARIANT_WIDTHS.items(), key=lambda item: item[1])
+        for label, max_width in widths:
+            resized = image.copy()
+            resized.thumbnail((max_width, image.height))
+            for fmt in enabled_formats():
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), **ENCODER_OPTIONS.get(fmt, {}))
+                if buffer.tell() >= original_size:
+                    # Not worth it, the original is smaller
+                    continue
+                encoded.append(EncodedVariant(label, fmt, resized.width, resized.height, buffer.getvalue()))
+            if resized.width >= image.width:
+                # Never upscale; one variant at the original size is enough
+                break
+    return size, encoded
+
+
+async def store_variants(
+    session: AsyncSession,
+    blob: Blob,
+    encoded: List[EncodedVariant],
+) -> List[ImageVariant]:
+    variants = []
+    for item in encoded:
+        stored = await store_blob(session, item.data, CONTENT_TYPES[item.format])
+        stored.width, stored.height = item.width, item.height
+        variant = ImageVariant(
+            source_hash=blob.hash,
+            label=item.label,
+            format=item.format,
+            width=item.width,
+            height=item.height,
+            blob_hash=stored.hash,
+        )
+        session.add(variant)
+        variants.append(variant)
+    return variants
+
+
+# -------------------------
+# Read path
+# -------------------------
+# Variants of a content hash never change once generated; least recently
+# used hashes are dropped past IMAGE_VARIANT_CACHE_ENTRIES
+_variant_cache: "OrderedDict[str, List[ImageVariant]]" = OrderedDict()
+
+
+async def get_variants(session: AsyncSession, source_hash: str) -> List[ImageVariant]:
+    variants = _variant_cache.get(source_hash)
+    if variants is not None:
+        _variant_cache.move_to_end(source_hash)
+        return variants
+    variants = (await session.exec(
+        select(ImageVariant).where(ImageVariant.source_hash == source_hash)
+    )).all()
+    for variant in variants:
+        session.expunge(variant)
+    if variants:
+        _variant_cache[source_hash] = variants
+        while len(_variant_cache) > settings.IMAGE_VARIANT_CACHE_ENTRIES:
+            _variant_cache.popitem(last=False)
+    return variants
+
+
+def pick_variant(
+    variants: List[ImageVariant],
+    accept: str,
+    width: Optional[int],
+) -> Optional[ImageVariant]:
+    # Formats the client lists explicitly with q > 0, best q first, ties in
+    # IMAGE_VARIANT_FORMATS order
+    qualities = parse_accept(accept)
+    accepted = sorted(
+        (fmt for fmt in settings.IMAGE_VARIANT_FORMATS if qualities.get(CONTENT_TYPES.get(fmt), 0.0) > 0),
+        key=lambda fmt: -qualities[CONTENT_TYPES[fmt]],
+    )
+    for fmt in accepted:
+        candidates = sorted((v for v in variants if v.format == fmt), key=lambda v: v.width)
+        if not candidates:
+            continue
+        if width:
+            # Smallest variant that still covers the requested width
+            for candidate in candidates:
+                if candidate.width >= width:
+                    return candidate
+        return candidates[-1]
+    return None
+
+
+async def serve_image(
+    request: Request,
+    session: AsyncSession,
+    key: str,
+    content_type: Optional[str],
+    version: Optional[str],
+    width: Optional[int],
+) -> Optional[Response]:
+    """
+    Respond with the best stored representation of image `key`, or None when
+    the image is not in the blob store yet.
+    """
+    variant = pick_variant(
+        await get_variants(session, key),
+        request.headers.get("accept", ""),
+        width,
+    )
+    label = f"{variant.label}.{variant.format}" if variant else None
+    headers = image_headers(key, version, label)
+    headers["Vary"] = "Accept"
+    if is_not_modified(request, headers.get("ETag")):
+        raise not_modified(headers)
+
+    response = None
+    if variant:
+        response = blob_response(variant.blob_hash, CONTENT_TYPES[variant.format])
+    if not response:
+        response = blob_response(key, content_type)
+    if response:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,135 @@
+"""
+Minimal JSON Patch (RFC 6902) over parsed JSON values.
+
+Supports add, remove, replace, move, copy and test with JSON Pointer
+(RFC 6901) paths. Operations are applied in place, in order; a failing
+operation raises PatchError (or PatchConflict for a failed `test`) and the
+caller discards the partially patched value.
+"""
+
+from typing import Any, Dict, List
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class PatchError(ValueError):
+    pass
+
+
+class PatchConflict(PatchError):
+    """A `test` operation did not match."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, for_add: bool = False) -> int:
+    if for_add and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not for_add):
+        raise PatchError(f"Array index {index} out of range")
+    return index
+
+
+def _child(value: Any, token: str) -> Any:
+    if isinstance(value, dict):
+        if token not in value:
+            raise PatchError(f"Member '{token}' not found")
+        return value[token]
+    if isinstance(value, list):
+        return value[_index(value, token)]
+    raise PatchError(f"Cannot descend into {type(value).__name__} at '{token}'")
+
+
+def resolve(document: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        document = _child(document, token)
+    return document
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], for_add=True), value)
+    else:
+        raise PatchError(f"Cannot add to {type(parent).__name__}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise PatchError("Cannot remove the document root")
+    parent = resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise PatchError(f"Member '{tokens[-1]}' not found")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, tokens[-1]))
+    raise PatchError(f"Cannot remove from {type(parent).__name__}")
+
+
+def apply_operation(document: Any, operation: Dict[str, Any]) -> Any:
+    """Apply one operation and return the (possibly replaced) document."""
+    op = operation.get("op")
+    if op not in OPERATIONS:
+        raise PatchError(f"Unknown operation '{op}'")
+    if not isinstance(operation.get("path"), str):
+        raise PatchError(f"'{op}' requires a path")
+    path = parse_pointer(operation["path"])
+    if op in ("add", "replace", "test") and "value" not in operation:
+        raise PatchError(f"'{op}' requires a value")
+
+    if op == "add":
+        return _add(document, path, operation["value"])
+    if op == "remove":
+        _remove(document, path)
+        return document
+    if op == "replace":
+        # The target must exist, unlike add
+        resolve(document, path)
+        if path:
+            _remove(document, path)
+        return _add(document, path, operation["value"])
+    if op == "test":
+        if resolve(document, path) != operation["value"]:
+            raise PatchConflict(f"Test failed at '{operation['path']}'")
+        return document
+
+    if not isinstance(operation.get("from"), str):
+        raise PatchError(f"'{op}' requires from")
+    source = parse_pointer(operation["from"])
+    if op == "move":
+        if path[:len(source)] == source and path != source:
+            raise PatchError("Cannot move a value into itself")
+        return _add(document, path, _remove(document, source))
+    # copy: deep enough for JSON values, nested containers are not shared
+    return _add(document, path, _copy(resolve(document, source)))
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise PatchError("Each operation must be an object")
+        document = apply_operation(document, operation)
+    return document
@@ -1,25 +1,45 @@
+# Imported first so boot phases are timed from here
+from startup import startup_timer
+
 import os
-import time
 import logging
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from database import create_db_and_tables
-from routers import about, projects, calendar, resume, settings, technologies, auth
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+startup_timer.mark("imports")
+
+import config
+from request_logging import AccessLogMiddleware, setup_logging, stop_logging
+startup_timer.mark("config")
+
+from database import create_db_and_tables, engine
+from sessions import async_engine, pool_stats, start_pool_tasks, stop_pool_tasks
+from versions import load_versions, start_version_polling, stop_version_polling
+startup_timer.mark("db_engine")
+
+from auth import get_current_admin, password_check_stats
+from catalog import technology_catalog
+from blobstore import UploadLimitMiddleware
+from metrics import MetricsMiddleware, registry
+from response_cache import response_cache
+from timeline import timeline_index
+from routers import about, projects, calendar, resume, settings, technologies, auth, bootstrap, bulk
 
 # ----------------------------
 # Logging Configuration
 # ----------------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # ----------------------------
 # FastAPI App Initialization
 # ----------------------------
-app = FastAPI(title="Portfolio API", version="1.0.0")
+app = FastAPI(
+    title="Portfolio API",
+    version="1.0.0",
+    # orjson is several times faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
+)
 
 origins = [
     "http://localhost:5173",
@@ -28,39 +48,26 @@ origins = [
     "https://ms16dev.github.io",
 ]
 
+# Added before CORS so 413 answers still carry the CORS headers
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor of the calendar API
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ----------------------------
-# Request Logging Middleware
-# ----------------------------
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    logger.info(f"Request: {request.method} {request.url.path}")
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        logger.info(
-            f"Response: {request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Duration: {process_time:.3f}s"
-        )
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Error: {request.method} {request.url.path} - "
-            f"Exception: {str(e)} - "
-            f"Duration: {process_time:.3f}s"
-        )
-        raise
+# Request Logging and Metrics Middleware
+# ----------------------------
+# Pure ASGI middleware; the last one added is outermost, so metrics also
+# time CORS and logging
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # ----------------------------
 # Global Exception Handler
@@ -68,7 +75,7 @@ async def log_requests(request: Request, call_next):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "An internal server error occurred",
@@ -81,8 +88,27 @@ async def global_exception_handler(request: Request, exc: Exception):
 # ----------------------------
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
-    logger.info("Database initialized")
+    if create_db_and_tables():
+        logger.info("Database initialized")
+    else:
+        logger.info("Database schema unchanged, skipped create/verify")
+    load_versions(engine)
+    startup_timer.mark("db_schema")
+
+@app.on_event("startup")
+async def start_pool():
+    # Pre-warming runs in the background, the app starts serving right away
+    start_pool_tasks()
+    # Picks up writes made through other instances
+    start_version_polling(async_engine, config.settings.VERSION_POLL_INTERVAL)
+    startup_timer.mark_ready()
+    logger.info(f"Startup timing: {startup_timer.report()}")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await stop_version_polling()
+    await stop_pool_tasks()
+    stop_logging()
 
 # ----------------------------
 # API Routers
@@ -94,6 +120,9 @@ app.include_router(calendar.router)
 app.include_router(resume.router)
 app.include_router(settings.router)
 app.include_router(technologies.router)
+app.include_router(bootstrap.router)
+app.include_router(bulk.router)
+startup_timer.mark("routers")
 
 # ----------------------------
 # Health and Root Endpoints
@@ -106,6 +135,42 @@ def read_root():
 def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/api/v1/health/cache")
+def cache_stats():
+    return response_cache.stats()
+
+@app.get("/api/v1/health/timeline")
+def timeline_stats():
+    return timeline_index.stats()
+
+@app.get("/api/v1/health/catalog")
+def catalog_stats():
+    return technology_catalog.stats()
+
+# Pool utilisation shows how close the API is to saturation
+@app.get("/api/v1/health/pool", dependencies=[Depends(get_current_admin)])
+def db_pool_stats():
+    return pool_stats()
+
+# ----------------------------
+# Metrics
+# ----------------------------
+@app.get("/api/v1/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/v1/health/startup")
+def startup_stats():
+    return startup_timer.report()
+
+# Throttle and password-check load would help tune a brute-force run
+@app.get("/api/v1/health/auth", dependencies=[Depends(get_current_admin)])
+def auth_stats():
+    return {
+        "password_checks": password_check_stats.as_dict(),
+        "throttle": auth.throttle_stats(),
+    }
+
 # ----------------------------
 # Dynamic Port Handling for Fly.io
 # ----------------------------
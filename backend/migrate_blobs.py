@@ -0,0 +1,72 @@
+"""
+One-time script to move image BLOBs out of the database into the blob store.
+Run manually per environment, after BLOB_STORE_DIR points at persistent storage.
+
+    python migrate_blobs.py            # move and clear the legacy columns
+    python migrate_blobs.py --keep     # copy only, leave the legacy columns
+"""
+
+import argparse
+import asyncio
+from fastapi import HTTPException
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import create_db_and_tables
+from sessions import async_engine
+from models import About, Project, Technology
+from blobstore import store_blob
+from images import store_image
+
+# (model, legacy BLOB column, hash column, size column)
+IMAGE_COLUMNS = [
+    (Project, "background_image", "background_hash", "background_size"),
+    (Technology, "image", "image_hash", "image_size"),
+    (About, "avatar_image", "avatar_hash", "avatar_size"),
+]
+
+
+async def migrate_column(model, blob_name: str, hash_name: str, size_name: str, keep: bool) -> int:
+    blob_column = getattr(model, blob_name)
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        ids = (await session.exec(
+            select(model.id).where(blob_column.is_not(None))
+        )).all()
+
+        # One row per transaction so memory stays bounded by the largest image
+        for row_id in ids:
+            data = (await session.exec(
+                select(blob_column).where(model.id == row_id)
+            )).one()
+            try:
+                blob = await store_image(session, data)
+            except HTTPException:
+                # Unrecognized format, legacy uploads were always served as PNG
+                blob = await store_blob(session, data, "image/png")
+
+            values = {hash_name: blob.hash, size_name: blob.size}
+            if not keep:
+                values[blob_name] = None
+            await session.exec(update(model).where(model.id == row_id).values(**values))
+            await session.commit()
+
+    return len(ids)
+
+
+async def migrate_blobs(keep: bool = False):
+    create_db_and_tables()
+    for model, blob_name, hash_name, size_name in IMAGE_COLUMNS:
+        moved = await migrate_column(model, blob_name, hash_name, size_name, keep)
+        print(f"[SUCCESS] {model.__tablename__}.{blob_name}: {moved} image(s) moved")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="leave the legacy BLOB columns populated",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(migrate_blobs(keep=args.keep))
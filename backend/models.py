@@ -1,8 +1,27 @@
 from typing import Optional, List
 from sqlmodel import Field, SQLModel, Column, Relationship
-from sqlalchemy import LargeBinary, Text
+from sqlalchemy import Index, LargeBinary, Text
 from datetime import date, datetime
 
+class Blob(SQLModel, table=True):
+    # Metadata for a file in the blob store, keyed by SHA-256 of its content
+    hash: str = Field(primary_key=True, max_length=64)
+    size: int
+    content_type: str = Field(default="application/octet-stream")
+    width: Optional[int] = None # Pixel size, raster images only
+    height: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ImageVariant(SQLModel, table=True):
+    # Resized/transcoded copy of a source image, generated at upload time
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source_hash: str = Field(index=True, max_length=64)
+    label: str # Size name from IMAGE_VARIANT_WIDTHS, e.g. "card"
+    format: str # "avif" or "webp"
+    width: int
+    height: int
+    blob_hash: str = Field(max_length=64)
+
 class ProjectTechnologyLink(SQLModel, table=True):
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", primary_key=True)
     technology_id: Optional[int] = Field(default=None, foreign_key="technology.id", primary_key=True)
@@ -13,13 +32,17 @@ class About(SQLModel, table=True):
     occupation: str = Field(default="Full Stack Developer")
     title: str
     description: str
-    avatar_image: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=(2**32)-1)))
+    avatar_image: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=(2**32)-1))) # Legacy, see migrate_blobs.py
+    avatar_size: Optional[int] = None
+    avatar_hash: Optional[str] = Field(default=None, max_length=64) # Blob store key
     social_links: str = Field(default="[]") # JSON string of links
 
 class Technology(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
-    image: bytes = Field(sa_column=Column(LargeBinary(length=(2**32)-1)))
+    image: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=(2**32)-1), nullable=True)) # Legacy, see migrate_blobs.py
+    image_size: Optional[int] = None
+    image_hash: Optional[str] = Field(default=None, max_length=64) # Blob store key
     projects: List["Project"] = Relationship(back_populates="technologies", link_model=ProjectTechnologyLink)
 
 class TechnologyRead(SQLModel):
@@ -33,7 +56,9 @@ class Project(SQLModel, table=True):
     end_date: Optional[date] = None
     description: str
     tags: str # Comma separated tags
-    background_image: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=(2**32)-1)))
+    background_image: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=(2**32)-1))) # Legacy, see migrate_blobs.py
+    background_size: Optional[int] = None # Byte size of the background image, kept in sync on write
+    background_hash: Optional[str] = Field(default=None, max_length=64) # Blob store key (SHA-256 of the image)
     github_link: Optional[str] = None
     live_demo_link: Optional[str] = None
     technologies: List[Technology] = Relationship(back_populates="projects", link_model=ProjectTechnologyLink)
@@ -51,6 +76,11 @@ class ProjectRead(SQLModel):
     technologies: List[TechnologyRead] = []
 
 class CalendarEvent(SQLModel, table=True):
+    # Keyset order is (start_date, id); range and per-project queries walk these
+    __table_args__ = (
+        Index("ix_calendarevent_start_date_id", "start_date", "id"),
+        Index("ix_calendarevent_project_id_start_date", "project_id", "start_date", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id")
     title: str
@@ -60,6 +90,7 @@ class CalendarEvent(SQLModel, table=True):
 
 class Resume(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Resume stored as one document, before ResumeSection; only read to migrate it
     content: str = Field(default="{}", sa_column=Column(Text(length=2**31-1))) # LONGTEXT for large JSON
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -72,4 +103,20 @@ class Admin(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(unique=True, index=True)
     hashed_password: str
+    # Bumped to revoke every token issued so far (JWT "ver" claim)
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class ChangeVersion(SQLModel, table=True):
+    # Version of one public collection, bumped by every write to it (see versions.py)
+    collection: str = Field(primary_key=True, max_length=32)
+    version: int = Field(default=0)
+    # Random per row, so a recreated row never repeats earlier validators
+    epoch: str = Field(max_length=16)
+    updated_at: datetime = Field(default_factory=lambda: datetime.utcnow().replace(microsecond=0))
 
+class ResumeSection(SQLModel, table=True):
+    # One section of the resume document; the rows are the stored resume
+    name: str = Field(primary_key=True, max_length=32) # See resume_sections.SECTIONS
+    content: str = Field(default="null", sa_column=Column(Text(length=2**31-1)))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,179 @@
+"""
+Structured, non-blocking request logging.
+
+Log records go through a QueueHandler; a background QueueListener thread
+formats them (JSON by default) and writes to stdout, so the event loop
+never blocks on I/O. The access-log middleware is pure ASGI, assigns every
+request an ID (reusing a valid incoming X-Request-ID), and logs successful
+requests at LOG_SAMPLE_RATE while always logging errors and slow requests.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import settings
+from startup import startup_timer
+
+logger = logging.getLogger("access")
+
+# Shown for log lines outside a request (startup, background tasks)
+NO_REQUEST_ID = "-"
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default=NO_REQUEST_ID)
+
+REQUEST_ID_HEADER = b"x-request-id"
+VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+# -------------------------
+# Formatting
+# -------------------------
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler pre-formats the record into plain text; keep it
+        # structured and only freeze the message arguments
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", NO_REQUEST_ID) != NO_REQUEST_ID:
+            entry["request_id"] = record.request_id
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Route all logging through a queue drained by a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        ))
+
+    # The filter runs on the calling side, where the request context is set
+    handler = StructuredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records; call on shutdown."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# -------------------------
+# Access log middleware
+# -------------------------
+def incoming_request_id(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == REQUEST_ID_HEADER:
+            candidate = value.decode("latin-1")
+            if VALID_REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+class AccessLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = incoming_request_id(scope)
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.perf_counter() - start
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1")),
+                    (b"x-process-time", f"{duration:.6f}".encode("latin-1")),
+                ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # The traceback is logged by the app's exception handler
+            error = repr(e)
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            failed = error is not None or status_code >= 500
+            slow = duration_ms >= settings.LOG_SLOW_REQUEST_MS
+            if failed or slow or random.random() < settings.LOG_SAMPLE_RATE:
+                logger.log(
+                    logging.ERROR if failed else logging.WARNING if slow else logging.INFO,
+                    f"{scope['method']} {scope['path']} {status_code}",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 3),
+                        "response_bytes": size,
+                        "client": scope["client"][0] if scope.get("client") else None,
+                        "error": error,
+                    },
+                )
+            request_id_var.reset(token)
+            startup_timer.mark_first_response()
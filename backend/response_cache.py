@@ -0,0 +1,211 @@
+"""
+In-process read-through cache of serialized public GET responses.
+
+Entries hold the final JSON bytes keyed by URL and are tagged with the
+collections they were built from. A committed admin write bumps those
+collections (versions.py), which evicts exactly the affected entries.
+Eviction is LRU bounded by total body size, with a TTL as a safety net.
+Compressed variants are cached next to the body under their own keys, so
+each version of a payload is compressed at most once.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from compression import available_codings, encode, encoded_response, negotiate
+from config import settings
+from metrics import CallbackGauge, registry
+from versions import get_version, on_change
+
+
+class CacheEntry:
+    __slots__ = ("body", "collections", "expires_at")
+
+    def __init__(self, body: bytes, collections: Tuple[str, ...], expires_at: float):
+        self.body = body
+        self.collections = collections
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def set(self, key: str, body: bytes, collections: Iterable[str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = CacheEntry(body, tuple(collections), time.monotonic() + self.ttl)
+            self._entries[key] = entry
+            self._size += len(body)
+            for collection in entry.collections:
+                self._tags.setdefault(collection, set()).add(key)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, collection: str) -> None:
+        with self._lock:
+            for key in list(self._tags.get(collection, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
+        for collection in entry.collections:
+            keys = self._tags.get(collection)
+            if keys:
+                keys.discard(key)
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL,
+)
+on_change(response_cache.invalidate)
+
+registry.register(CallbackGauge(
+    "response_cache_requests_total", "Response cache lookups by result.",
+    lambda: [(("hit",), response_cache.hits), (("miss",), response_cache.misses)],
+    ("result",), kind="counter",
+))
+registry.register(CallbackGauge(
+    "response_cache_bytes", "Bytes held by the response cache.",
+    lambda: [((), response_cache.stats()["bytes"])],
+))
+
+
+def cache_key(request: Request) -> str:
+    # Host is part of the key because payloads embed absolute image URLs
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.base_url}{request.url.path.lstrip('/')}?{query}"
+
+
+def serialize(content: Any) -> bytes:
+    return orjson.dumps(jsonable_encoder(content))
+
+
+def versions_of(collections: Tuple[str, ...]) -> list:
+    return [get_version(name).version for name in collections]
+
+
+async def cached_body(
+    key: str,
+    collections: Tuple[str, ...],
+    build: Callable[[], Awaitable[Any]],
+) -> bytes:
+    """Return the cached JSON body for `key`, or build, serialize and cache it."""
+    body = response_cache.get(key)
+    if body is None:
+        before = versions_of(collections)
+        body = serialize(await build())
+        # A write committed while building may already have invalidated this
+        # key; only cache the body if it is still current
+        if before == versions_of(collections):
+            response_cache.set(key, body, collections)
+    return body
+
+
+async def cached_encoding(
+    key: str,
+    collections: Tuple[str, ...],
+    body: bytes,
+    coding: str,
+) -> Optional[bytes]:
+    """Return `body` encoded with `coding`, compressing (and caching) it once."""
+    encoded = response_cache.get(f"{key}#{coding}")
+    if encoded is None:
+        before = versions_of(collections)
+        # Only the coding this client asked for, at a request-path level
+        encoded = await run_in_threadpool(encode, body, coding)
+        if encoded is not None and before == versions_of(collections):
+            response_cache.set(f"{key}#{coding}", encoded, collections)
+    return encoded
+
+
+async def json_response(
+    request: Request,
+    response: Response,
+    key: str,
+    collections: Tuple[str, ...],
+    body: bytes,
+) -> Response:
+    """
+    Wrap a cached JSON body, compressed when it is large and the client
+    accepts it. Headers already set on `response` (e.g. validators) are
+    carried over.
+    """
+    coding = None
+    if len(body) >= settings.COMPRESS_MIN_BYTES:
+        coding = negotiate(request, available_codings())
+        if coding:
+            encoded = await cached_encoding(key, collections, body, coding)
+            if encoded is None:
+                coding = None
+            else:
+                body = encoded
+    return encoded_response(body, coding, "application/json", dict(response.headers))
+
+
+async def cached_json(
+    request: Request,
+    response: Response,
+    collections: Tuple[str, ...],
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """Serve the cached body for this URL, or build, serialize and cache it."""
+    key = cache_key(request)
+    body = await cached_body(key, collections, build)
+    return await json_response(request, response, key, collections, body)
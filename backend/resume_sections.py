@@ -0,0 +1,78 @@
+"""
+The resume document stored as sections, one row each.
+
+Section names follow the frontend's resume components; each owns one
+top-level member of the document. Members outside these sections are kept
+together in the OTHER row. A section whose member the document lacks has
+no row. The full document is joined from the rows on read.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+# Section name -> (document member, value when missing)
+SECTIONS = {
+    "header": ("personalInfo", dict),
+    "experience": ("experience", list),
+    "education": ("education", list),
+    "skills": ("skills", list),
+    "certifications": ("certifications", list),
+    "languages": ("languages", list),
+}
+SECTION_BY_MEMBER = {member: name for name, (member, _) in SECTIONS.items()}
+
+# Row holding every member outside SECTIONS as one object; it always exists
+# once the resume has been stored
+OTHER = "other"
+ALL_SECTIONS = (*SECTIONS, OTHER)
+
+
+def dump(value: Any) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def section_of(member: str) -> str:
+    return SECTION_BY_MEMBER.get(member, OTHER)
+
+
+def split_sections(
+    document: Dict[str, Any],
+    names: Optional[Iterable[str]] = None,
+) -> Dict[str, Optional[str]]:
+    """Serialized content of each section in `names` (default: all); None if absent."""
+    sections = {}
+    for name in names if names is not None else ALL_SECTIONS:
+        if name == OTHER:
+            sections[name] = dump({
+                member: value for member, value in document.items() if member not in SECTION_BY_MEMBER
+            })
+            continue
+        member = SECTIONS[name][0]
+        sections[name] = dump(document[member]) if member in document else None
+    return sections
+
+
+def merge_sections(sections: Dict[str, str]) -> Dict[str, Any]:
+    """Parse serialized sections back into (the matching part of) the document."""
+    document = {}
+    for name, content in sections.items():
+        if name == OTHER:
+            document.update(orjson.loads(content))
+        else:
+            document[SECTIONS[name][0]] = orjson.loads(content)
+    return document
+
+
+def join_sections(sections: Dict[str, str]) -> bytes:
+    """The document as JSON, spliced from the serialized sections without parsing them."""
+    members = [
+        orjson.dumps(member) + b":" + sections[name].encode("utf-8")
+        for name, (member, _) in SECTIONS.items()
+        if name in sections
+    ]
+    other = sections.get(OTHER, "{}").encode("utf-8")
+    if other != b"{}":
+        # Compact orjson output: the object's members without its braces
+        members.append(other[1:-1])
+    return b"{" + b",".join(members) + b"}"
@@ -1,49 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlmodel import Session, select
-from database import engine
-from models import About, Technology, Admin
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session
+from models import About, Blob, Project, Technology, Admin
 from auth import get_current_admin
+from http_cache import IMAGE_VERSION_LENGTH, check_image_version, conditional, image_headers
+from response_cache import cached_json
+from versions import touch
+from blobstore import read_blob
+from images import legacy_content_type, serve_image, store_upload
+from routers.technologies import set_technology_image, technology_image_url
 import base64
 import json
 
 router = APIRouter(prefix="/api/v1/about", tags=["about"])
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+async def encode_image(key, legacy):
+    # Blob store first, the legacy BLOB column until migrate_blobs.py has run
+    data = await read_blob(key) or legacy
+    return base64.b64encode(data).decode('utf-8') if data else None
 
-@router.get("/")
-def get_about(session: Session = Depends(get_session)):
-    about = session.exec(select(About)).first()
-    if not about:
+def avatar_url(request: Request, avatar_hash: Optional[str]) -> str:
+    url = f"{request.base_url}api/v1/about/avatar"
+    return f"{url}?v={avatar_hash[:IMAGE_VERSION_LENGTH]}" if avatar_hash else url
+
+async def build_about(request: Request, session: AsyncSession, inline: bool = False) -> dict:
+    row = (await session.exec(
+        select(
+            About.id,
+            About.name,
+            About.occupation,
+            About.title,
+            About.description,
+            About.social_links,
+            About.avatar_hash,
+            About.avatar_size,
+            About.avatar_image.is_not(None).label("has_legacy_avatar"),
+            Blob.width.label("avatar_width"),
+            Blob.height.label("avatar_height"),
+        ).outerjoin(Blob, Blob.hash == About.avatar_hash)
+    )).first()
+    if not row:
         return {
             "name": "My Name",
             "occupation": "Developer",
             "title": "Welcome",
             "description": "Please configure.",
-            "avatar_image": None,
+            "avatar_image_url": None,
             "social_links": "[]"
         }
-    
-    # Convert bytes to base64 string for frontend
-    about_dict = about.model_dump()
-    if about.avatar_image:
-        about_dict["avatar_image"] = base64.b64encode(about.avatar_image).decode('utf-8')
-    
+
+    about_dict = row._asdict()
+    has_avatar = about_dict.pop("has_legacy_avatar") or row.avatar_hash
+    about_dict["avatar_image_url"] = avatar_url(request, row.avatar_hash) if has_avatar else None
+
+    # Base64 copy of the avatar for older clients, opt-in only
+    if inline:
+        legacy = None
+        if row.has_legacy_avatar:
+            legacy = (await session.exec(select(About.avatar_image).where(About.id == row.id))).first()
+        about_dict["avatar_image"] = await encode_image(row.avatar_hash, legacy)
+
     return about_dict
 
+@router.get("/", dependencies=[conditional("about")])
+async def get_about(
+    request: Request,
+    response: Response,
+    inline: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(request, response, ("about",), lambda: build_about(request, session, inline))
+
+@router.get("/avatar")
+async def get_avatar(
+    request: Request,
+    v: Optional[str] = None,
+    w: Optional[int] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    check_image_version(request, v)
+
+    row = (await session.exec(
+        select(About.id, About.avatar_hash, Blob.content_type)
+        .outerjoin(Blob, Blob.hash == About.avatar_hash)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if row.avatar_hash:
+        response = await serve_image(request, session, row.avatar_hash, row.content_type, v, w)
+        if response:
+            return response
+
+    # Not moved to the blob store yet, serve the legacy column
+    image = (await session.exec(select(About.avatar_image).where(About.id == row.id))).first()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return Response(
+        content=image,
+        media_type=legacy_content_type(image),
+        headers=image_headers(row.avatar_hash, v),
+    )
+
 @router.post("/")
-def update_about(
+async def update_about(
+    request: Request,
     name: str = Form(...),
     occupation: str = Form(...),
     title: str = Form(...),
     description: str = Form(...),
     social_links: str = Form(...),
     avatar: UploadFile = File(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    existing_about = session.exec(select(About)).first()
+    existing_about = (await session.exec(select(About))).first()
     if not existing_about:
         existing_about = About(
             name=name, occupation=occupation, title=title, 
@@ -57,51 +131,89 @@ def update_about(
         existing_about.social_links = social_links
     
     if avatar:
-        existing_about.avatar_image = avatar.file.read()
+        blob = await store_upload(session, avatar)
+        existing_about.avatar_hash = blob.hash
+        existing_about.avatar_size = blob.size
+        existing_about.avatar_image = None
     
     session.add(existing_about)
-    session.commit()
-    session.refresh(existing_about)
-    
-    # Return with base64 for immediate UI update if needed
-    result = existing_about.model_dump()
-    if existing_about.avatar_image:
-        result["avatar_image"] = base64.b64encode(existing_about.avatar_image).decode('utf-8')
-    return result
+    touch(session, "about")
+    await session.commit()
+
+    return await build_about(request, session)
 
 # Technology Endpoints
-@router.get("/technologies")
-def get_technologies(session: Session = Depends(get_session)):
-    techs = session.exec(select(Technology)).all()
+async def build_technologies(request: Request, session: AsyncSession, inline: bool = False) -> list:
+    rows = (await session.exec(
+        select(
+            Technology.id,
+            Technology.title,
+            Technology.image_hash,
+            Technology.image_size,
+            Technology.image.is_not(None).label("has_legacy_image"),
+            Blob.width.label("image_width"),
+            Blob.height.label("image_height"),
+        )
+        .outerjoin(Blob, Blob.hash == Technology.image_hash)
+        .order_by(Technology.id)
+    )).all()
+
     result = []
-    for tech in techs:
-        tech_dict = tech.model_dump()
-        if tech.image:
-            tech_dict["image"] = base64.b64encode(tech.image).decode('utf-8')
+    for row in rows:
+        tech_dict = row._asdict()
+        has_image = tech_dict.pop("has_legacy_image") or row.image_hash
+        tech_dict["image_url"] = technology_image_url(request, row.id, row.image_hash) if has_image else None
+
+        # Base64 copy of the icon for older clients, opt-in only
+        if inline:
+            legacy = None
+            if row.has_legacy_image:
+                legacy = (await session.exec(select(Technology.image).where(Technology.id == row.id))).first()
+            tech_dict["image"] = await encode_image(row.image_hash, legacy)
         result.append(tech_dict)
     return result
 
+@router.get("/technologies", dependencies=[conditional("technologies")])
+async def get_technologies(
+    request: Request,
+    response: Response,
+    inline: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(
+        request, response, ("technologies",),
+        lambda: build_technologies(request, session, inline),
+    )
+
 @router.post("/technologies")
-def add_technology(
+async def add_technology(
     title: str = Form(...),
     image: UploadFile = File(...),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    tech = Technology(title=title, image=image.file.read())
+    tech = Technology(title=title)
+    await set_technology_image(session, tech, image)
     session.add(tech)
-    session.commit()
+    touch(session, "technologies")
+    await session.commit()
     return {"status": "success"}
 
 @router.delete("/technologies/{tech_id}")
-def delete_technology(
+async def delete_technology(
     tech_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    tech = session.get(Technology, tech_id)
+    # Links are removed with the row; async sessions cannot lazy load them
+    tech = await session.get(
+        Technology,
+        tech_id,
+        options=[defer(Technology.image), selectinload(Technology.projects).load_only(Project.id)],
+    )
     if not tech:
         raise HTTPException(status_code=404, detail="Technology not found")
-    session.delete(tech)
-    session.commit()
+    await session.delete(tech)
+    touch(session, "technologies", "projects")
+    await session.commit()
     return {"status": "success"}
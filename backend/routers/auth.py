@@ -1,37 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import timedelta
-from auth import get_session
+from sessions import get_session
 from models import Admin
+from config import settings
+from throttle import AttemptLimiter
 from auth import (
-    verify_password,
+    check_password,
     create_access_token,
+    get_current_admin,
     get_password_hash,
+    revoke_tokens,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
+# Failed logins, per client IP and per username
+ip_limiter = AttemptLimiter(settings.LOGIN_MAX_FAILURES_PER_IP, settings.LOGIN_FAILURE_WINDOW)
+user_limiter = AttemptLimiter(settings.LOGIN_MAX_FAILURES_PER_USER, settings.LOGIN_FAILURE_WINDOW)
+
+
+def client_ip(request: Request) -> str:
+    # Fly's proxy passes the real client address in Fly-Client-IP
+    return request.headers.get("fly-client-ip") or (request.client.host if request.client else "unknown")
+
+
+def throttle_stats() -> dict:
+    return {"ip": ip_limiter.stats(), "username": user_limiter.stats()}
+
 
 @router.post("/token")
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Login endpoint - returns JWT access token."""
-    admin = session.exec(select(Admin).where(Admin.username == form_data.username)).first()
+    ip = client_ip(request)
+    username = form_data.username.lower()
+    # Refuse before any DB or bcrypt work once a client or account is locked out
+    for limiter, key in ((ip_limiter, ip), (user_limiter, username)):
+        retry_after = limiter.retry_after(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    admin = (await session.exec(select(Admin).where(Admin.username == form_data.username))).first()
     
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+    if not admin or not await check_password(form_data.password, admin.hashed_password):
+        ip_limiter.record_failure(ip)
+        user_limiter.record_failure(username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_limiter.reset(username)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": admin.username}, expires_delta=access_token_expires
+        data={"sub": admin.username, "ver": admin.token_version},
+        expires_delta=access_token_expires,
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.post("/revoke")
+async def revoke(
+    current_admin: Admin = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
+):
+    """Sign out everywhere - invalidates all tokens issued to this admin."""
+    admin = await session.get(Admin, current_admin.id)
+    if not admin:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Admin not found")
+    await revoke_tokens(session, admin)
+    return {"ok": True}
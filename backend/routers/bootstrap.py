@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session
+from http_cache import (
+    cache_policy,
+    collection_etag,
+    collection_last_modified,
+    is_not_modified,
+    not_modified,
+    validator_headers,
+)
+from response_cache import cached_body
+from routers.about import build_about, build_technologies
+from routers.calendar import build_events, build_timeline
+from routers.projects import load_project_summaries
+from routers.resume import build_resume
+from routers.settings import build_settings
+
+router = APIRouter(prefix="/api/v1/bootstrap", tags=["bootstrap"])
+
+
+async def build_settings_timeline(session: AsyncSession) -> dict:
+    """The timeline over the years configured in Settings."""
+    settings = await build_settings(session)
+    return await build_timeline(
+        session,
+        date(settings.calendar_start_year, 1, 1),
+        date(settings.calendar_end_year, 12, 31),
+    )
+
+
+class Section:
+    def __init__(
+        self,
+        collections: Tuple[str, ...],
+        build: Callable[[Request, AsyncSession], Awaitable[object]],
+    ):
+        self.collections = collections
+        self.build = build
+
+
+# Everything the public pages need, keyed by the name used in ?fields=
+SECTIONS: Dict[str, Section] = {
+    "about": Section(("about",), lambda request, session: build_about(request, session)),
+    "technologies": Section(("technologies",), lambda request, session: build_technologies(request, session)),
+    "settings": Section(("settings",), lambda request, session: build_settings(session)),
+    "calendar": Section(("calendar",), lambda request, session: build_events(session)),
+    "timeline": Section(("calendar", "settings"), lambda request, session: build_settings_timeline(session)),
+    "projects": Section(("projects", "technologies"), load_project_summaries),
+    "resume": Section(("resume",), lambda request, session: build_resume(session)),
+}
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(SECTIONS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # Canonical order, so equivalent selections produce identical bodies
+    return [name for name in SECTIONS if name in names]
+
+
+@router.get("/")
+async def get_bootstrap(
+    request: Request,
+    fields: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    The public page data in one response. Each section is serialized once
+    per version of its collections and spliced into the body as-is.
+    """
+    names = parse_fields(fields)
+    collections = tuple(sorted({c for name in names for c in SECTIONS[name].collections}))
+
+    etag = collection_etag(*collections)
+    last_modified = collection_last_modified(*collections)
+    headers = validator_headers(etag, cache_policy("bootstrap"), last_modified)
+    if is_not_modified(request, etag, last_modified):
+        raise not_modified(headers)
+
+    parts = []
+    for name in names:
+        section = SECTIONS[name]
+        # Host is part of the key because fragments embed absolute image URLs
+        fragment = await cached_body(
+            f"bootstrap:{request.base_url}:{name}",
+            section.collections,
+            lambda: section.build(request, session),
+        )
+        parts.append(b'"' + name.encode() + b'":' + fragment)
+
+    return Response(
+        content=b"{" + b",".join(parts) + b"}",
+        media_type="application/json",
+        headers=headers,
+    )
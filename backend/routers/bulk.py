@@ -0,0 +1,442 @@
+from datetime import date
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Type
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, false, func, insert, update
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import async_engine, get_session
+from models import Admin, Blob, CalendarEvent, Project, ProjectTechnologyLink, Technology
+from auth import get_current_admin
+from catalog import technology_catalog
+from config import settings
+from versions import touch
+
+router = APIRouter(prefix="/api/v1/bulk", tags=["bulk"])
+
+NDJSON = "application/x-ndjson"
+# Rows per IN (...) list and per exported batch
+BATCH_SIZE = 500
+
+
+def chunks(items: Sequence[Any], size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# -------------------------
+# Row schemas
+# -------------------------
+# Rows carry every column except image BLOBs. Images are referenced by their
+# blob store hash, so an export can be imported as-is. A row whose id exists
+# is updated; any other row is inserted (keeping its id if it has one).
+class TechnologyRow(BaseModel):
+    id: Optional[int] = None
+    title: str
+    image_hash: Optional[str] = None
+
+
+class ProjectRow(BaseModel):
+    id: Optional[int] = None
+    title: str
+    start_date: date
+    end_date: Optional[date] = None
+    description: str
+    tags: str
+    github_link: Optional[str] = None
+    live_demo_link: Optional[str] = None
+    background_hash: Optional[str] = None
+    # Replaces the project's links when present
+    technology_ids: Optional[List[int]] = None
+
+
+class CalendarRow(BaseModel):
+    id: Optional[int] = None
+    project_id: Optional[int] = None
+    title: str
+    start_date: date
+    end_date: Optional[date] = None
+    icon: Optional[str] = None
+
+
+class RowError(Exception):
+    pass
+
+
+# -------------------------
+# Batched reference checks
+# -------------------------
+async def existing_ids(session: AsyncSession, model: Type[SQLModel], ids: Set[int]) -> Set[int]:
+    found: Set[int] = set()
+    for chunk in chunks(sorted(ids)):
+        found.update((await session.exec(select(model.id).where(model.id.in_(chunk)))).all())
+    return found
+
+
+async def blob_sizes(session: AsyncSession, hashes: Set[str]) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for chunk in chunks(sorted(hashes)):
+        rows = (await session.exec(select(Blob.hash, Blob.size).where(Blob.hash.in_(chunk)))).all()
+        sizes.update({row.hash: row.size for row in rows})
+    return sizes
+
+
+# Each check returns {row index: error} and may add derived column values
+# (e.g. image sizes looked up from the blob store) to `derived`
+async def check_technologies(
+    session: AsyncSession,
+    rows: List[Tuple[int, TechnologyRow]],
+    derived: Dict[int, dict],
+) -> Dict[int, str]:
+    sizes = await blob_sizes(session, {row.image_hash for _, row in rows if row.image_hash})
+    errors = {}
+    for index, row in rows:
+        if row.image_hash and row.image_hash not in sizes:
+            errors[index] = f"Unknown image_hash '{row.image_hash}'"
+        elif row.image_hash:
+            # As with an upload, the legacy BLOB column is superseded
+            derived[index] = {"image_size": sizes[row.image_hash], "image": None}
+    return errors
+
+
+async def check_projects(
+    session: AsyncSession,
+    rows: List[Tuple[int, ProjectRow]],
+    derived: Dict[int, dict],
+) -> Dict[int, str]:
+    sizes = await blob_sizes(session, {row.background_hash for _, row in rows if row.background_hash})
+    _, unknown = await technology_catalog.resolve(
+        session, {tech_id for _, row in rows for tech_id in row.technology_ids or ()}
+    )
+    errors = {}
+    for index, row in rows:
+        missing = sorted(set(row.technology_ids or ()) & set(unknown))
+        if row.background_hash and row.background_hash not in sizes:
+            errors[index] = f"Unknown background_hash '{row.background_hash}'"
+        elif missing:
+            errors[index] = f"Unknown technology_ids {missing}"
+        elif row.background_hash:
+            derived[index] = {"background_size": sizes[row.background_hash], "background_image": None}
+    return errors
+
+
+async def check_calendar(
+    session: AsyncSession,
+    rows: List[Tuple[int, CalendarRow]],
+    derived: Dict[int, dict],
+) -> Dict[int, str]:
+    projects = await existing_ids(session, Project, {row.project_id for _, row in rows if row.project_id})
+    errors = {}
+    for index, row in rows:
+        if row.project_id and row.project_id not in projects:
+            errors[index] = f"Unknown project_id {row.project_id}"
+        elif row.end_date and row.end_date < row.start_date:
+            errors[index] = "end_date is before start_date"
+    return errors
+
+
+# -------------------------
+# Export enrichment
+# -------------------------
+async def add_technology_ids(session: AsyncSession, rows: List[dict]) -> None:
+    by_project = {row["id"]: row for row in rows}
+    for row in rows:
+        row["technology_ids"] = []
+    links = (await session.exec(
+        select(ProjectTechnologyLink.project_id, ProjectTechnologyLink.technology_id)
+        .where(ProjectTechnologyLink.project_id.in_(list(by_project)))
+        .order_by(ProjectTechnologyLink.project_id, ProjectTechnologyLink.technology_id)
+    )).all()
+    for project_id, technology_id in links:
+        by_project[project_id]["technology_ids"].append(technology_id)
+
+
+class BulkResource:
+    def __init__(
+        self,
+        model: Type[SQLModel],
+        schema: Type[BaseModel],
+        collections: Tuple[str, ...],
+        columns: Tuple[Any, ...],
+        check: Callable[[AsyncSession, list, Dict[int, dict]], Awaitable[Dict[int, str]]],
+        enrich: Optional[Callable[[AsyncSession, List[dict]], Awaitable[None]]] = None,
+    ):
+        self.model = model
+        self.schema = schema
+        self.collections = collections
+        self.columns = columns
+        self.check = check
+        self.enrich = enrich
+
+
+# Keyed by the name used in the URL, matching the public routes
+RESOURCES: Dict[str, BulkResource] = {
+    "technologies": BulkResource(
+        Technology, TechnologyRow, ("technologies",),
+        (Technology.id, Technology.title, Technology.image_hash),
+        check_technologies,
+    ),
+    "projects": BulkResource(
+        Project, ProjectRow, ("projects",),
+        (
+            Project.id, Project.title, Project.start_date, Project.end_date,
+            Project.description, Project.tags, Project.github_link,
+            Project.live_demo_link, Project.background_hash,
+        ),
+        check_projects,
+        add_technology_ids,
+    ),
+    "calendar": BulkResource(
+        CalendarEvent, CalendarRow, ("calendar",),
+        (
+            CalendarEvent.id, CalendarEvent.project_id, CalendarEvent.title,
+            CalendarEvent.start_date, CalendarEvent.end_date, CalendarEvent.icon,
+        ),
+        check_calendar,
+    ),
+}
+
+
+def get_resource(name: str) -> BulkResource:
+    resource = RESOURCES.get(name)
+    if resource is None:
+        raise HTTPException(status_code=404, detail=f"Unknown resource '{name}'")
+    return resource
+
+
+# -------------------------
+# Request parsing
+# -------------------------
+async def read_body(request: Request) -> bytes:
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > settings.BULK_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Body exceeds {settings.BULK_MAX_BYTES} bytes")
+    return bytes(body)
+
+
+def parse_rows(body: bytes, content_type: str) -> List[Any]:
+    """
+    A JSON array, or one JSON value per line for NDJSON. An unparsable NDJSON
+    line becomes a RowError in its slot, so the other rows are still checked.
+    """
+    if content_type.split(";")[0].strip() == NDJSON:
+        rows: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
+                rows.append(RowError(f"Invalid JSON: {e}"))
+    else:
+        try:
+            rows = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array or NDJSON")
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_ROWS} rows per request")
+    return rows
+
+
+def validate_rows(schema: Type[BaseModel], items: List[Any]) -> Tuple[List[Tuple[int, BaseModel]], Dict[int, str]]:
+    rows, errors = [], {}
+    seen_ids: Set[int] = set()
+    for index, item in enumerate(items):
+        if isinstance(item, RowError):
+            errors[index] = str(item)
+            continue
+        try:
+            row = schema.model_validate(item)
+        except ValidationError as e:
+            errors[index] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in e.errors()
+            )
+            continue
+        if row.id is not None:
+            if row.id in seen_ids:
+                errors[index] = f"Duplicate id {row.id}"
+                continue
+            seen_ids.add(row.id)
+        rows.append((index, row))
+    return rows, errors
+
+
+async def assign_ids(session: AsyncSession, model: Type[SQLModel], rows: List[dict]) -> None:
+    """
+    Give rows without an id the next free ids, so the batch can be inserted
+    without reading generated keys back row by row. The max is read under a
+    lock, so concurrent imports wait instead of handing out the same ids.
+    MySQL and SQLite continue their auto-increment after the highest
+    explicit id, so later single inserts do not collide with these.
+    """
+    if async_engine.dialect.name == "sqlite":
+        # No row locks: a write that matches nothing takes the database write
+        # lock (waiting busy_timeout for other writers) before the read
+        await session.exec(update(model).where(false()).values(id=model.id))
+    highest = (await session.exec(select(func.max(model.id)).with_for_update())).one() or 0
+    taken = {values["id"] for values in rows if values["id"] is not None}
+    for values in rows:
+        if values["id"] is None:
+            highest += 1
+            while highest in taken:
+                highest += 1
+            values["id"] = highest
+
+
+async def insert_grouped(session: AsyncSession, model: Type[SQLModel], rows: List[dict]) -> None:
+    """One executemany INSERT per column set and chunk; drivers send each as a batch."""
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for values in rows:
+        groups.setdefault(tuple(sorted(values)), []).append(values)
+    for group in groups.values():
+        for chunk in chunks(group):
+            await session.exec(insert(model), params=chunk)
+
+
+# -------------------------
+# Import
+# -------------------------
+@router.post("/{name}")
+async def import_rows(
+    name: str,
+    request: Request,
+    skip_invalid: bool = False,
+    session: AsyncSession = Depends(get_session),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Insert or update many rows in one transaction. Every row is validated
+    first; by default any error rejects the whole batch (422 listing each
+    failing row), with `skip_invalid=true` the valid rows are still written.
+    """
+    resource = get_resource(name)
+    model = resource.model
+    items = parse_rows(await read_body(request), request.headers.get("content-type", ""))
+
+    rows, errors = validate_rows(resource.schema, items)
+    derived: Dict[int, dict] = {}
+    errors.update(await resource.check(session, rows, derived))
+    error_list = [{"row": index, "error": message} for index, message in sorted(errors.items())]
+    if error_list and not skip_invalid:
+        raise HTTPException(status_code=422, detail={"errors": error_list})
+    rows = [(index, row) for index, row in rows if index not in errors]
+
+    existing = await existing_ids(session, model, {row.id for _, row in rows if row.id is not None})
+    links: Dict[int, List[int]] = {}
+    updates: List[dict] = []
+    created: List[Tuple[int, dict, Optional[List[int]]]] = []
+    report = []
+    for index, row in rows:
+        technology_ids = getattr(row, "technology_ids", None)
+        if row.id in existing:
+            # Fields left out of the row keep their stored value
+            values = row.model_dump(exclude_unset=True, exclude={"technology_ids"})
+            values.update(derived.get(index, {}))
+            updates.append(values)
+            if technology_ids is not None:
+                links[row.id] = technology_ids
+            report.append({"row": index, "id": row.id, "status": "updated"})
+        else:
+            values = row.model_dump(exclude={"technology_ids"})
+            values.update(derived.get(index, {}))
+            created.append((index, values, technology_ids))
+
+    if updates:
+        # Grouped by column set, then sent as executemany UPDATE ... WHERE id = ?
+        groups: Dict[Tuple[str, ...], List[dict]] = {}
+        for values in updates:
+            groups.setdefault(tuple(sorted(values)), []).append(values)
+        for group in groups.values():
+            await session.exec(update(model), params=group)
+    if created:
+        await assign_ids(session, model, [values for _, values, _ in created])
+        await insert_grouped(session, model, [values for _, values, _ in created])
+        for index, values, technology_ids in created:
+            if technology_ids is not None:
+                links[values["id"]] = technology_ids
+            report.append({"row": index, "id": values["id"], "status": "created"})
+
+    if links:
+        for chunk in chunks(list(links)):
+            await session.exec(
+                delete(ProjectTechnologyLink).where(ProjectTechnologyLink.project_id.in_(chunk))
+            )
+        link_rows = [
+            {"project_id": project_id, "technology_id": technology_id}
+            for project_id, technology_ids in links.items()
+            for technology_id in dict.fromkeys(technology_ids)
+        ]
+        if link_rows:
+            await insert_grouped(session, ProjectTechnologyLink, link_rows)
+
+    if report:
+        touch(session, *resource.collections)
+    await session.commit()
+
+    report.sort(key=lambda entry: entry["row"])
+    return {
+        "created": sum(1 for entry in report if entry["status"] == "created"),
+        "updated": sum(1 for entry in report if entry["status"] == "updated"),
+        "rows": report,
+        "errors": error_list,
+    }
+
+
+# -------------------------
+# Export
+# -------------------------
+async def export_rows(resource: BulkResource) -> AsyncIterator[List[dict]]:
+    """
+    Rows in id order, BATCH_SIZE at a time. Keyset batches in one read
+    transaction keep memory flat and leave the connection free for the
+    enrichment queries between batches.
+    """
+    # Own session: the response body is produced after the route returns
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        last_id = None
+        while True:
+            statement = select(*resource.columns).order_by(resource.model.id).limit(BATCH_SIZE)
+            if last_id is not None:
+                statement = statement.where(resource.model.id > last_id)
+            rows = [row._asdict() for row in (await session.exec(statement)).all()]
+            if not rows:
+                return
+            if resource.enrich:
+                await resource.enrich(session, rows)
+            yield rows
+            last_id = rows[-1]["id"]
+
+
+async def ndjson_stream(resource: BulkResource) -> AsyncIterator[bytes]:
+    async for rows in export_rows(resource):
+        yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+async def json_array_stream(resource: BulkResource) -> AsyncIterator[bytes]:
+    separator = b"["
+    async for rows in export_rows(resource):
+        yield separator + b",".join(orjson.dumps(row) for row in rows)
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+
+@router.get("/{name}")
+async def export(
+    name: str,
+    fmt: str = Query("ndjson", alias="format"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Stream every row of a resource, in the shape the import accepts."""
+    resource = get_resource(name)
+    if fmt == "ndjson":
+        return StreamingResponse(ndjson_stream(resource), media_type=NDJSON)
+    if fmt == "json":
+        return StreamingResponse(json_array_stream(resource), media_type="application/json")
+    raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'json'")
@@ -1,27 +1,140 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from database import engine
+import base64
+import binascii
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, func, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session
 from models import CalendarEvent, Admin
 from auth import get_current_admin
+from http_cache import conditional
+from response_cache import cache_key, cached_json, json_response, response_cache, serialize, versions_of
+from timeline import timeline_index
+from versions import get_version, touch
 from datetime import date
 
 router = APIRouter(prefix="/api/v1/calendar", tags=["calendar"])
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+COLLECTIONS = ("calendar",)
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.get("/", response_model=List[CalendarEvent])
-def get_events(session: Session = Depends(get_session)):
-    return session.exec(select(CalendarEvent)).all()
+# Keyset cursor: the (start_date, id) of the last event on the previous page
+def encode_cursor(event: CalendarEvent) -> str:
+    raw = f"{event.start_date.isoformat()}:{event.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-from datetime import date
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_date, _, event_id = raw.partition(":")
+        return date.fromisoformat(start_date), int(event_id)
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def build_events(
+    session: AsyncSession,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    project_id: Optional[int] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+) -> list:
+    """Events overlapping [date_from, date_to], in keyset order."""
+    query = select(CalendarEvent)
+    if date_to is not None:
+        query = query.where(CalendarEvent.start_date <= date_to)
+    if date_from is not None:
+        # An event without an end date lasts a single day
+        query = query.where(func.coalesce(CalendarEvent.end_date, CalendarEvent.start_date) >= date_from)
+    if project_id is not None:
+        query = query.where(CalendarEvent.project_id == project_id)
+    if after is not None:
+        start_date, event_id = after
+        query = query.where(or_(
+            CalendarEvent.start_date > start_date,
+            and_(CalendarEvent.start_date == start_date, CalendarEvent.id > event_id),
+        ))
+    query = query.order_by(CalendarEvent.start_date, CalendarEvent.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return (await session.exec(query)).all()
+
+@router.get("/", response_model=List[CalendarEvent], dependencies=[conditional("calendar")])
+async def get_events(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    project_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Events overlapping the optional `from`/`to` window, ordered by start
+    date. With `limit`, a full page carries an X-Next-Cursor header; pass it
+    back as `cursor` (with the same filters) for the next page.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    after = decode_cursor(cursor) if cursor else None
+
+    key = cache_key(request)
+    next_key = f"{key}#next"
+    body, next_cursor = response_cache.get(key), response_cache.get(next_key)
+    if body is None or next_cursor is None:
+        before = versions_of(COLLECTIONS)
+        # One extra row tells whether another page follows
+        events = await build_events(
+            session, date_from, date_to, project_id, after,
+            limit + 1 if limit else None,
+        )
+        next_cursor = b""
+        if limit and len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_cursor(events[-1]).encode()
+        body = serialize(events)
+        if before == versions_of(COLLECTIONS):
+            response_cache.set(key, body, COLLECTIONS)
+            response_cache.set(next_key, next_cursor, COLLECTIONS)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor.decode()
+    return await json_response(request, response, key, COLLECTIONS, body)
+
+async def build_timeline(
+    session: AsyncSession,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> dict:
+    await timeline_index.ensure_current(lambda: build_events(session))
+    return timeline_index.viewport(date_from, date_to)
+
+@router.get("/timeline", dependencies=[conditional("calendar")])
+async def get_timeline(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Events overlapping the viewport, each with the overlap lane it is drawn
+    in, plus the number of events active in each year of the viewport.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    return await cached_json(
+        request, response, COLLECTIONS,
+        lambda: build_timeline(session, date_from, date_to),
+    )
 
 @router.post("/", response_model=CalendarEvent)
-def create_event(
+async def create_event(
     event: CalendarEvent,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
     if isinstance(event.start_date, str):
@@ -30,18 +143,21 @@ def create_event(
         event.end_date = date.fromisoformat(event.end_date)
         
     session.add(event)
-    session.commit()
-    session.refresh(event)
+    touch(session, "calendar")
+    expected_version = get_version("calendar").version
+    await session.commit()
+    await session.refresh(event)
+    timeline_index.apply(expected_version, upsert=event)
     return event
 
 @router.put("/{event_id}", response_model=CalendarEvent)
-def update_event(
+async def update_event(
     event_id: int,
     event: CalendarEvent,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    db_event = session.get(CalendarEvent, event_id)
+    db_event = await session.get(CalendarEvent, event_id)
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
     event_data = event.dict(exclude_unset=True)
@@ -52,19 +168,25 @@ def update_event(
             value = date.fromisoformat(value)
         setattr(db_event, key, value)
     session.add(db_event)
-    session.commit()
-    session.refresh(db_event)
+    touch(session, "calendar")
+    expected_version = get_version("calendar").version
+    await session.commit()
+    await session.refresh(db_event)
+    timeline_index.apply(expected_version, upsert=db_event)
     return db_event
 
 @router.delete("/{event_id}")
-def delete_event(
+async def delete_event(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    event = session.get(CalendarEvent, event_id)
+    event = await session.get(CalendarEvent, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    session.delete(event)
-    session.commit()
+    await session.delete(event)
+    touch(session, "calendar")
+    expected_version = get_version("calendar").version
+    await session.commit()
+    timeline_index.apply(expected_version, remove=event_id)
     return {"ok": True}
@@ -8,72 +8,206 @@ from fastapi import (
     Response,
     Request
 )
-from sqlmodel import Session, select
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import date
 import json
 
-from database import engine
-from models import Project, Technology, ProjectRead, Admin
+from sessions import get_session, lock_for_update
+from catalog import technology_catalog
+from models import Blob, Project, ProjectTechnologyLink, Technology, ProjectRead, Admin
+from images import legacy_content_type, serve_image, store_upload
 from auth import get_current_admin
+from http_cache import IMAGE_VERSION_LENGTH, check_image_version, conditional, image_headers
+from response_cache import cached_json
+from versions import touch
 
 router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
 
 
 # -------------------------
-# DB session dependency
+# Helper: build background URL safely
 # -------------------------
-def get_session():
-    with Session(engine) as session:
-        yield session
+def project_background_url(request: Request, project_id: int, image_hash: str) -> str:
+    # The hash makes the URL content-addressed, so browsers may cache it forever
+    return f"{request.base_url}api/v1/projects/{project_id}/background?v={image_hash[:IMAGE_VERSION_LENGTH]}"
 
 
 # -------------------------
-# Helper: build background URL safely
+# Helper: keep background metadata in sync with the image
 # -------------------------
-def project_background_url(request: Request, project_id: int) -> str:
-    return f"{request.base_url}api/v1/projects/{project_id}/background"
+async def set_background_image(
+    session: AsyncSession,
+    project: Project,
+    upload: UploadFile,
+) -> None:
+    blob = await store_upload(session, upload)
+    project.background_hash = blob.hash
+    project.background_size = blob.size
+    project.background_image = None
 
 
 # -------------------------
-# GET all projects
+# Helper: technology links
+# -------------------------
+def parse_technology_ids(raw: str) -> List[int]:
+    # A JSON array or a comma separated list
+    try:
+        if raw.strip().startswith("["):
+            return [int(tech_id) for tech_id in json.loads(raw)]
+        return [int(tech_id) for tech_id in raw.split(",") if tech_id.strip()]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid technology_ids: {e}")
+
+
+async def resolve_technology_ids(session: AsyncSession, raw: str) -> List[int]:
+    """Parse and validate ids against the technology catalog, without loading rows."""
+    ids = list(dict.fromkeys(parse_technology_ids(raw)))
+    _, unknown = await technology_catalog.resolve(session, ids)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown technology_ids {unknown}")
+    return ids
+
+
+async def sync_technology_links(
+    session: AsyncSession,
+    project_id: int,
+    technology_ids: List[int],
+    current: Optional[set] = None,
+) -> None:
+    """Insert and delete only the link rows that differ from `technology_ids`."""
+    if current is None:
+        # Concurrent updates of the project serialize here, and the locking
+        # read sees links committed after this transaction's first read
+        await lock_for_update(session, Project, Project.id == project_id)
+        current = set((await session.exec(
+            select(ProjectTechnologyLink.technology_id)
+            .where(ProjectTechnologyLink.project_id == project_id)
+            .with_for_update()
+        )).all())
+    removed = current - set(technology_ids)
+    added = [tech_id for tech_id in technology_ids if tech_id not in current]
+    if removed:
+        await session.exec(
+            delete(ProjectTechnologyLink)
+            .where(ProjectTechnologyLink.project_id == project_id)
+            .where(ProjectTechnologyLink.technology_id.in_(removed))
+        )
+    if added:
+        await session.exec(
+            insert(ProjectTechnologyLink),
+            params=[{"project_id": project_id, "technology_id": tech_id} for tech_id in added],
+        )
+
+
 # -------------------------
-@router.get("/", response_model=List[ProjectRead])
-def get_projects(
+# Helper: lean project listing
+# -------------------------
+# Columns needed to build a ProjectRead; background_image is deliberately
+# absent so the listing never pulls image BLOBs out of the database.
+SUMMARY_COLUMNS = (
+    Project.id,
+    Project.title,
+    Project.start_date,
+    Project.end_date,
+    Project.description,
+    Project.tags,
+    Project.github_link,
+    Project.live_demo_link,
+    Project.background_hash,
+)
+
+
+async def load_project_summaries(
     request: Request,
-    session: Session = Depends(get_session)
-):
-    projects = session.exec(select(Project)).unique().all()
-    result = []
+    session: AsyncSession,
+    project_ids: Optional[List[int]] = None,
+) -> List[dict]:
+    statement = select(*SUMMARY_COLUMNS).order_by(Project.id)
+    if project_ids is not None:
+        statement = statement.where(Project.id.in_(project_ids))
+    rows = (await session.exec(statement)).all()
+
+    # All technology links for the listed projects in one batched query
+    technologies = {row.id: [] for row in rows}
+    if technologies:
+        links = (await session.exec(
+            select(ProjectTechnologyLink.project_id, Technology.id, Technology.title)
+            .join(Technology, Technology.id == ProjectTechnologyLink.technology_id)
+            .where(ProjectTechnologyLink.project_id.in_(list(technologies)))
+            .order_by(ProjectTechnologyLink.project_id, Technology.id)
+        )).all()
+        for project_id, tech_id, tech_title in links:
+            technologies[project_id].append({"id": tech_id, "title": tech_title})
 
-    for project in projects:
-        data = project.dict(exclude={"background_image"})
+    result = []
+    for row in rows:
+        data = row._asdict()
+        background_hash = data.pop("background_hash")
         data["background_image_url"] = (
-            project_background_url(request, project.id)
-            if project.background_image
+            project_background_url(request, row.id, background_hash)
+            if background_hash
             else None
         )
-        data["technologies"] = project.technologies
+        data["technologies"] = technologies[row.id]
         result.append(data)
 
     return result
 
 
+# -------------------------
+# GET all projects
+# -------------------------
+@router.get("/", response_model=List[ProjectRead], dependencies=[conditional("projects", "technologies")])
+async def get_projects(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(
+        request, response, ("projects", "technologies"),
+        lambda: load_project_summaries(request, session),
+    )
+
+
 # -------------------------
 # GET project background image
 # -------------------------
 @router.get("/{project_id}/background")
-def get_project_background(
+async def get_project_background(
     project_id: int,
-    session: Session = Depends(get_session)
+    request: Request,
+    v: Optional[str] = None,
+    w: Optional[int] = None,
+    session: AsyncSession = Depends(get_session)
 ):
-    project = session.get(Project, project_id)
+    check_image_version(request, v)
 
-    if not project or not project.background_image:
+    row = (await session.exec(
+        select(Project.background_hash, Blob.content_type)
+        .outerjoin(Blob, Blob.hash == Project.background_hash)
+        .where(Project.id == project_id)
+    )).first()
+    if not row or not row.background_hash:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    response = await serve_image(request, session, row.background_hash, row.content_type, v, w)
+    if response:
+        return response
+
+    # Not moved to the blob store yet, serve the legacy column
+    image = (await session.exec(
+        select(Project.background_image).where(Project.id == project_id)
+    )).first()
+    if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
     return Response(
-        content=project.background_image,
-        media_type="image/png"
+        content=image,
+        media_type=legacy_content_type(image),
+        headers=image_headers(row.background_hash, v),
     )
 
 
@@ -81,7 +215,7 @@ def get_project_background(
 # CREATE project
 # -------------------------
 @router.post("/", response_model=ProjectRead)
-def create_project(
+async def create_project(
     request: Request,
     title: str = Form(...),
     description: str = Form(...),
@@ -92,9 +226,11 @@ def create_project(
     live_demo_link: Optional[str] = Form(None),
     background_image: Optional[UploadFile] = None,
     technology_ids: Optional[str] = Form(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
+    tech_ids = await resolve_technology_ids(session, technology_ids) if technology_ids else []
+
     new_project = Project(
         title=title,
         description=description,
@@ -103,43 +239,25 @@ def create_project(
         tags=tags,
         github_link=github_link,
         live_demo_link=live_demo_link,
-        background_image=background_image.file.read() if background_image else None,
     )
-
-    # Attach technologies
-    if technology_ids:
-        try:
-            ids = (
-                json.loads(technology_ids)
-                if technology_ids.strip().startswith("[")
-                else [int(i) for i in technology_ids.split(",") if i.strip()]
-            )
-            for tech_id in ids:
-                tech = session.get(Technology, tech_id)
-                if tech:
-                    new_project.technologies.append(tech)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid technology_ids: {e}")
+    if background_image:
+        await set_background_image(session, new_project, background_image)
 
     session.add(new_project)
-    session.commit()
-    session.refresh(new_project)
-
-    data = new_project.dict(exclude={"background_image"})
-    data["background_image_url"] = (
-        project_background_url(request, new_project.id)
-        if new_project.background_image
-        else None
-    )
+    # Flush for the generated id, then write the links directly
+    await session.flush()
+    await sync_technology_links(session, new_project.id, tech_ids, current=set())
+    touch(session, "projects")
+    await session.commit()
 
-    return data
+    return (await load_project_summaries(request, session, [new_project.id]))[0]
 
 
 # -------------------------
 # UPDATE project
 # -------------------------
 @router.put("/{project_id}", response_model=ProjectRead)
-def update_project(
+async def update_project(
     project_id: int,
     request: Request,
     title: Optional[str] = Form(None),
@@ -151,12 +269,13 @@ def update_project(
     live_demo_link: Optional[str] = Form(None),
     background_image: Optional[UploadFile] = None,
     technology_ids: Optional[str] = Form(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    project = session.get(Project, project_id)
+    project = await session.get(Project, project_id, options=[defer(Project.background_image)])
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    tech_ids = await resolve_technology_ids(session, technology_ids) if technology_ids is not None else None
 
     if title is not None:
         project.title = title
@@ -173,51 +292,42 @@ def update_project(
     if live_demo_link is not None:
         project.live_demo_link = live_demo_link
     if background_image:
-        project.background_image = background_image.file.read()
-
-    # Replace technologies
-    if technology_ids is not None:
-        project.technologies.clear()
-        try:
-            ids = (
-                json.loads(technology_ids)
-                if technology_ids.strip().startswith("[")
-                else [int(i) for i in technology_ids.split(",") if i.strip()]
-            )
-            for tech_id in ids:
-                tech = session.get(Technology, tech_id)
-                if tech:
-                    project.technologies.append(tech)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid technology_ids: {e}")
+        await set_background_image(session, project, background_image)
+
+    # Replace technologies, touching only the links that changed
+    if tech_ids is not None:
+        await sync_technology_links(session, project.id, tech_ids)
 
     session.add(project)
-    session.commit()
-    session.refresh(project)
-
-    data = project.dict(exclude={"background_image"})
-    data["background_image_url"] = (
-        project_background_url(request, project.id)
-        if project.background_image
-        else None
-    )
+    touch(session, "projects")
+    await session.commit()
 
-    return data
+    return (await load_project_summaries(request, session, [project.id]))[0]
 
 
 # -------------------------
 # DELETE project
 # -------------------------
 @router.delete("/{project_id}")
-def delete_project(
+async def delete_project(
     project_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    project = session.get(Project, project_id)
+    # Technology links are replaced or removed below; async sessions cannot
+    # lazy load them, so fetch them up front
+    project = await session.get(
+        Project,
+        project_id,
+        options=[
+            defer(Project.background_image),
+            selectinload(Project.technologies).defer(Technology.image),
+        ],
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    session.delete(project)
-    session.commit()
+    await session.delete(project)
+    touch(session, "projects")
+    await session.commit()
     return {"ok": True}
@@ -1,42 +1,232 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from database import engine
-from models import Resume, Admin
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session, lock_for_update
+from models import ResumeSection, Admin
 from auth import get_current_admin
+from compression import available_codings, encoded_response, negotiate
+from http_cache import cache_policy, conditional, is_not_modified, not_modified, validator_headers
+from json_patch import PatchConflict, PatchError, apply_patch, parse_pointer
+from response_cache import cached_encoding, cached_json, response_cache, versions_of
+from resume_sections import (
+    ALL_SECTIONS, OTHER, SECTIONS, dump, join_sections, merge_sections, section_of, split_sections,
+)
+from versions import touch
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/resume", tags=["resume"])
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-
 class ResumeUpdate(BaseModel):
     content: str
 
-@router.get("/")
-def get_resume(session: Session = Depends(get_session)):
-    resume = session.exec(select(Resume)).first()
-    if not resume:
-        return {"content": "{}"}
-    return {"content": resume.content}
+RESUME = ("resume",)
+DOCUMENT_KEY = "resume:document"
+SECTION_KEY = "resume:section:"
+
+async def load_document(session: AsyncSession) -> bytes:
+    """The document joined from its section rows, cached until the resume changes."""
+    body = response_cache.get(DOCUMENT_KEY)
+    if body is None:
+        before = versions_of(RESUME)
+        rows = (await session.exec(select(ResumeSection.name, ResumeSection.content))).all()
+        body = join_sections(dict(rows))
+        if before == versions_of(RESUME):
+            response_cache.set(DOCUMENT_KEY, body, RESUME)
+    return body
+
+async def build_resume(session: AsyncSession) -> dict:
+    return {"content": (await load_document(session)).decode("utf-8")}
+
+def section_body(name: str, content: Optional[str]) -> bytes:
+    # A section the document lacks reads as its empty value
+    return (content if content is not None else dump(SECTIONS[name][1]())).encode("utf-8")
+
+async def load_section(session: AsyncSession, name: str) -> bytes:
+    content = (await session.exec(
+        select(ResumeSection.content).where(ResumeSection.name == name)
+    )).first()
+    return section_body(name, content)
+
+def section_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+
+@router.get("/", dependencies=[conditional("resume")])
+async def get_resume(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(request, response, RESUME, lambda: build_resume(session))
+
+@router.get("/document", dependencies=[conditional("resume")])
+async def get_resume_document(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    The resume JSON as the response body itself, rather than a string inside
+    `{"content": ...}`, compressed once per version in the negotiated coding.
+    """
+    body = await load_document(session)
+    coding = negotiate(request, available_codings())
+    if coding:
+        encoded = await cached_encoding(DOCUMENT_KEY, RESUME, body, coding)
+        if encoded is None:
+            coding = None
+        else:
+            body = encoded
+    return encoded_response(body, coding, "application/json", dict(response.headers))
+
+@router.get("/sections/{name}")
+async def get_resume_section(
+    name: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    One section of the resume. Its ETag is derived from the section's own
+    content, so sections an edit did not touch still revalidate with a 304.
+    """
+    if name not in SECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown resume section")
+    key = SECTION_KEY + name
+    body = response_cache.get(key)
+    if body is None:
+        before = versions_of(RESUME)
+        body = await load_section(session, name)
+        if before == versions_of(RESUME):
+            response_cache.set(key, body, RESUME)
+
+    headers = validator_headers(section_etag(body), cache_policy("resume"))
+    if is_not_modified(request, headers["ETag"]):
+        raise not_modified(headers)
+    coding = negotiate(request, available_codings())
+    if coding:
+        encoded = await cached_encoding(key, RESUME, body, coding)
+        if encoded is None:
+            coding = None
+        else:
+            body = encoded
+    return encoded_response(body, coding, "application/json", headers)
+
+async def lock_sections(session: AsyncSession, names: Iterable[str]) -> Dict[str, ResumeSection]:
+    """Rows of the sections in `names`, locked until the commit."""
+    names = sorted(names)
+    await lock_for_update(session, ResumeSection, ResumeSection.name.in_(names))
+    rows = (await session.exec(
+        select(ResumeSection).where(ResumeSection.name.in_(names)).with_for_update()
+    )).all()
+    return {row.name: row for row in rows}
+
+async def write_sections(
+    session: AsyncSession,
+    rows: Dict[str, ResumeSection],
+    sections: Dict[str, Optional[str]],
+) -> None:
+    """Store the sections whose content changed; None removes a section."""
+    now = datetime.utcnow()
+    changed = False
+    for name, content in sections.items():
+        row = rows.get(name)
+        if content is None:
+            if row is not None:
+                await session.delete(row)
+                changed = True
+        elif row is None:
+            session.add(ResumeSection(name=name, content=content, updated_at=now))
+            changed = True
+        elif row.content != content:
+            row.content = content
+            row.updated_at = now
+            session.add(row)
+            changed = True
+    if changed:
+        touch(session, "resume")
+    await session.commit()
 
 @router.post("/")
-def create_or_update_resume(
+async def create_or_update_resume(
     resume_data: ResumeUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    existing_resume = session.exec(select(Resume)).first()
-    if existing_resume:
-        existing_resume.content = resume_data.content
-        session.add(existing_resume)
-        session.commit()
-        session.refresh(existing_resume)
-        return {"content": existing_resume.content}
-    else:
-        new_resume = Resume(content=resume_data.content)
-        session.add(new_resume)
-        session.commit()
-        session.refresh(new_resume)
-        return {"content": new_resume.content}
+    try:
+        document = orjson.loads(resume_data.content)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Resume content must be valid JSON")
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=400, detail="Resume content must be a JSON object")
+
+    # Section rows whose content is unchanged are not rewritten
+    rows = await lock_sections(session, ALL_SECTIONS)
+    await write_sections(session, rows, split_sections(document))
+    return {"content": resume_data.content}
+
+def patched_sections(operations: Any) -> Tuple[set, set]:
+    """Sections `operations` read and write; a pointer to the root means all of them."""
+    read, written = set(), set()
+    for operation in operations:
+        if not isinstance(operation, dict):
+            continue
+        op = operation.get("op")
+        for pointer, writes in ((operation.get("path"), op != "test"), (operation.get("from"), op == "move")):
+            if not isinstance(pointer, str):
+                continue
+            tokens = parse_pointer(pointer)
+            names = {section_of(tokens[0])} if tokens else set(ALL_SECTIONS)
+            read |= names
+            if writes:
+                written |= names
+    return read, written
+
+@router.patch("/")
+async def patch_resume(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Apply JSON Patch (RFC 6902) operations to the resume document, e.g.
+    `[{"op": "replace", "path": "/experience/0/role", "value": "Lead"}]`.
+    Only the sections the operations refer to are loaded, and only those
+    they write to are stored again; a failed `test` operation rejects the
+    whole patch with a 409.
+    """
+    try:
+        operations = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Patch must be valid JSON")
+    if not isinstance(operations, list):
+        raise HTTPException(status_code=400, detail="Patch must be a JSON array of operations")
+
+    try:
+        read, written = patched_sections(operations)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    rows = await lock_sections(session, read)
+    # Part of the document: the members the operations can reach
+    document = merge_sections({name: row.content for name, row in rows.items()})
+    try:
+        document = apply_patch(document, operations)
+    except PatchConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=422, detail="Resume content must be a JSON object")
+
+    sections = split_sections(document, sorted(written))
+    if written:
+        await write_sections(session, rows, sections)
+    return {
+        "sections": {
+            name: section_etag(section_body(name, content))
+            for name, content in sections.items()
+            if name != OTHER
+        }
+    }
@@ -1,36 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from database import engine
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session
 from models import Settings, Admin
 from auth import get_current_admin
-
-def get_session():
-    with Session(engine) as session:
-        yield session
+from http_cache import conditional
+from response_cache import cached_json
+from versions import touch
 
 router = APIRouter(
     prefix="/api/v1/settings",
     tags=["settings"]
 )
 
-@router.get("/", response_model=Settings)
-def get_settings(session: Session = Depends(get_session)):
-    settings = session.exec(select(Settings)).first()
+async def build_settings(session: AsyncSession) -> Settings:
+    settings = (await session.exec(select(Settings))).first()
     if not settings:
         # Create default settings if none exist
         settings = Settings()
         session.add(settings)
-        session.commit()
-        session.refresh(settings)
+        touch(session, "settings")
+        await session.commit()
+        await session.refresh(settings)
     return settings
 
+@router.get("/", response_model=Settings, dependencies=[conditional("settings")])
+async def get_settings(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(request, response, ("settings",), lambda: build_settings(session))
+
 @router.put("/", response_model=Settings)
-def update_settings(
+async def update_settings(
     settings_update: Settings,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    db_settings = session.exec(select(Settings)).first()
+    db_settings = (await session.exec(select(Settings))).first()
     if not db_settings:
         db_settings = Settings()
         session.add(db_settings)
@@ -39,6 +47,7 @@ def update_settings(
     db_settings.calendar_end_year = settings_update.calendar_end_year
     
     session.add(db_settings)
-    session.commit()
-    session.refresh(db_settings)
+    touch(session, "settings")
+    await session.commit()
+    await session.refresh(db_settings)
     return db_settings
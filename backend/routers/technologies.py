@@ -1,50 +1,108 @@
-from typing import List
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Response
-from sqlmodel import Session, select
-from database import engine
-from models import Technology, TechnologyRead, Admin
+from typing import List, Optional
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, Response
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sessions import get_session
+from models import Blob, Project, Technology, TechnologyRead, Admin
 from auth import get_current_admin
+from http_cache import IMAGE_VERSION_LENGTH, check_image_version, conditional, image_headers
+from response_cache import cached_json
+from versions import touch
+from images import legacy_content_type, serve_image, store_upload
 
 router = APIRouter(prefix="/api/v1/technologies", tags=["technologies"])
 
-def get_session():
-    with Session(engine) as session:
-        yield session
+def technology_image_url(request: Request, tech_id: int, image_hash: Optional[str]) -> str:
+    url = f"{request.base_url}api/v1/technologies/{tech_id}/image"
+    return f"{url}?v={image_hash[:IMAGE_VERSION_LENGTH]}" if image_hash else url
 
-@router.get("/", response_model=List[TechnologyRead])
-def get_technologies(session: Session = Depends(get_session)):
-    return session.exec(select(Technology)).all()
+async def set_technology_image(session: AsyncSession, tech: Technology, upload: UploadFile) -> None:
+    blob = await store_upload(session, upload)
+    tech.image_hash = blob.hash
+    tech.image_size = blob.size
+    tech.image = None
 
-@router.post("/")
-def create_technology(
+async def build_technology_list(session: AsyncSession) -> list:
+    rows = (await session.exec(select(Technology.id, Technology.title))).all()
+    return [row._asdict() for row in rows]
+
+@router.get("/", response_model=List[TechnologyRead], dependencies=[conditional("technologies")])
+async def get_technologies(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
+    return await cached_json(
+        request, response, ("technologies",),
+        lambda: build_technology_list(session),
+    )
+
+@router.post("/", response_model=TechnologyRead)
+async def create_technology(
     title: str = Form(...),
     image: UploadFile = File(...),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    image_bytes = image.file.read()
-    tech = Technology(title=title, image=image_bytes)
+    tech = Technology(title=title)
+    await set_technology_image(session, tech, image)
     session.add(tech)
-    session.commit()
-    session.refresh(tech)
+    touch(session, "technologies")
+    await session.commit()
+    await session.refresh(tech)
     return tech
 
 @router.get("/{tech_id}/image")
-def get_technology_image(tech_id: int, session: Session = Depends(get_session)):
-    tech = session.get(Technology, tech_id)
-    if not tech or not tech.image:
+async def get_technology_image(
+    tech_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    w: Optional[int] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    check_image_version(request, v)
+
+    row = (await session.exec(
+        select(Technology.image_hash, Blob.content_type)
+        .outerjoin(Blob, Blob.hash == Technology.image_hash)
+        .where(Technology.id == tech_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if row.image_hash:
+        response = await serve_image(request, session, row.image_hash, row.content_type, v, w)
+        if response:
+            return response
+
+    # Not moved to the blob store yet, serve the legacy column
+    image = (await session.exec(
+        select(Technology.image).where(Technology.id == tech_id)
+    )).first()
+    if not image:
         raise HTTPException(status_code=404, detail="Image not found")
-    return Response(content=tech.image, media_type="image/png")
+    return Response(
+        content=image,
+        media_type=legacy_content_type(image),
+        headers=image_headers(row.image_hash, v),
+    )
 
 @router.delete("/{tech_id}")
-def delete_technology(
+async def delete_technology(
     tech_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    tech = session.get(Technology, tech_id)
+    # Links are removed with the row; async sessions cannot lazy load them
+    tech = await session.get(
+        Technology,
+        tech_id,
+        options=[defer(Technology.image), selectinload(Technology.projects).load_only(Project.id)],
+    )
     if not tech:
          raise HTTPException(status_code=404)
-    session.delete(tech)
-    session.commit()
+    await session.delete(tech)
+    touch(session, "technologies", "projects")
+    await session.commit()
     return {"ok": True}
@@ -0,0 +1,240 @@
+"""
+Async engine, connection pool and per-request sessions.
+
+Every module takes its session from `get_session`. FastAPI caches a
+dependency per request, so the auth dependency and the route share one
+session (and one pooled connection). Idle connections are checked by a
+background liveness task instead of a ping on every checkout, and the pool
+records how long checkouts wait. A few connections are opened right after
+startup so the first visitors after a cold start find them ready.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+from sqlalchemy import exc, false, inspect, select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import settings
+from database import ASYNC_DATABASE_URL, async_connect_args, configure_engine
+from metrics import CallbackGauge, registry
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# Instrumented pool
+# -------------------------
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait times and peak usage."""
+
+    WINDOW = 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._waits: deque = deque(maxlen=self.WINDOW)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+
+    def recreate(self):
+        # Keep the counters when the pool is rebuilt after a disconnect
+        pool = super().recreate()
+        pool.__dict__.update({
+            name: getattr(self, name)
+            for name in ("_stats_lock", "_waits", "checkouts", "timeouts",
+                         "wait_total", "wait_max", "peak_checked_out")
+        })
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._waits.append(waited)
+            self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return connection
+
+    def stats(self) -> Dict[str, Any]:
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        with self._stats_lock:
+            recent = sorted(self._waits)
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": checked_out,
+                "checked_in": self.checkedin(),
+                "overflow": self.overflow(),
+                "utilization": round(checked_out / capacity, 4) if capacity else 0.0,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_p95_ms": round(recent[int(len(recent) * 0.95)] * 1000, 3) if recent else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+# SQLAlchemy keeps its "sqlalchemy.*" loggers at WARNING; pool subclasses
+# log under their own module name, so match that here
+logging.getLogger(f"{__name__}.{InstrumentedPool.__name__}").setLevel(logging.WARNING)
+
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=async_connect_args,
+    echo=False,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    # Reconnect before the server (MySQL wait_timeout) drops idle connections
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
+configure_engine(async_engine.sync_engine)
+
+
+def pool_stats() -> Dict[str, Any]:
+    return async_engine.pool.stats()
+
+
+def _pool_connections():
+    pool = async_engine.pool
+    return [
+        (("checked_out",), pool.checkedout()),
+        (("checked_in",), pool.checkedin()),
+        (("overflow",), max(pool.overflow(), 0)),
+    ]
+
+
+registry.register(CallbackGauge(
+    "db_pool_connections", "Async pool connections by state.", _pool_connections, ("state",),
+))
+registry.register(CallbackGauge(
+    "db_pool_size", "Configured pool size.", lambda: [((), async_engine.pool.size())],
+))
+registry.register(CallbackGauge(
+    "db_pool_checkouts_total", "Connections checked out of the pool.",
+    lambda: [((), async_engine.pool.checkouts)], kind="counter",
+))
+registry.register(CallbackGauge(
+    "db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection.",
+    lambda: [((), async_engine.pool.timeouts)], kind="counter",
+))
+registry.register(CallbackGauge(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for pool checkouts.",
+    lambda: [((), async_engine.pool.wait_total)], kind="counter",
+))
+
+
+# -------------------------
+# Request session dependency
+# -------------------------
+async def get_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def lock_for_update(session: AsyncSession, model, *criteria) -> None:
+    """
+    Lock the `model` rows matching `criteria` until the transaction ends, so
+    concurrent writers of the same rows wait. SQLite has no row locks: a
+    write that changes nothing takes the database write lock instead
+    (waiting up to busy_timeout for other writers).
+    """
+    key = inspect(model).primary_key[0]
+    if async_engine.dialect.name == "sqlite":
+        await session.exec(update(model).where(false()).values({key: key}))
+    else:
+        await session.exec(select(key).where(*criteria).with_for_update())
+
+
+# -------------------------
+# Pool pre-warming
+# -------------------------
+async def prewarm_pool(connections: int) -> int:
+    """
+    Open `connections` pooled connections at once so the first visitors do
+    not each pay a TLS handshake. Runs alongside serving, failures are only
+    logged: requests simply connect on demand.
+    """
+    conns = [async_engine.connect() for _ in range(connections)]
+    results = await asyncio.gather(*(conn.start() for conn in conns), return_exceptions=True)
+    opened = 0
+    for conn, result in zip(conns, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Pool pre-warm connection failed: {result}")
+            continue
+        opened += 1
+        await conn.close()
+    return opened
+
+
+# -------------------------
+# Background liveness checks
+# -------------------------
+async def check_idle_connections() -> int:
+    """
+    Ping each idle connection once. The pool hands connections out in FIFO
+    order, so consecutive checkouts walk through the idle ones. A failed ping
+    invalidates the pool, and stale connections are replaced on next use.
+    """
+    checked = 0
+    for _ in range(async_engine.pool.checkedin()):
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except exc.DBAPIError as e:
+            logger.warning(f"Pool liveness check failed: {e}")
+            break
+        checked += 1
+    return checked
+
+
+async def liveness_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await check_idle_connections()
+        except Exception as e:
+            logger.warning(f"Pool liveness loop error: {e}")
+
+
+_background_tasks: List[asyncio.Task] = []
+
+
+def start_pool_tasks() -> None:
+    """Start pre-warming and liveness checks without delaying startup."""
+    if _background_tasks:
+        return
+    if settings.DB_POOL_PREWARM > 0:
+        _background_tasks.append(asyncio.create_task(prewarm_pool(settings.DB_POOL_PREWARM)))
+    if settings.DB_LIVENESS_INTERVAL > 0:
+        _background_tasks.append(asyncio.create_task(liveness_loop(settings.DB_LIVENESS_INTERVAL)))
+
+
+async def stop_pool_tasks() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    await async_engine.dispose()
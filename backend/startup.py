@@ -0,0 +1,46 @@
+"""
+Boot timing for cold-start tuning.
+
+main.py marks the end of each startup phase; the first completed response
+is recorded too, so /api/v1/health/startup shows where a cold start went.
+Times are measured from the moment this module is imported, which main.py
+does first.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.ready: Optional[float] = None
+        self.first_response: Optional[float] = None
+
+    def mark(self, phase: str) -> None:
+        """Record the time since the previous mark as `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def mark_ready(self) -> None:
+        self.ready = time.perf_counter() - self.started
+
+    def mark_first_response(self) -> None:
+        if self.first_response is None:
+            self.first_response = time.perf_counter() - self.started
+
+    def report(self) -> Dict[str, Any]:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 2) if seconds is not None else None
+
+        return {
+            "phases_ms": {phase: ms(seconds) for phase, seconds in self.phases.items()},
+            "ready_ms": ms(self.ready),
+            "first_response_ms": ms(self.first_response),
+        }
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,59 @@
+"""
+In-memory attempt throttling for the login endpoint.
+
+Failed attempts are counted per key (client IP, username) in a sliding
+window; once a key reaches its limit further attempts are refused until the
+oldest failure leaves the window. State is per process, which is enough for
+a single instance and resets on deploy.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class AttemptLimiter:
+    def __init__(self, max_attempts: int, window: float, max_keys: int = 10000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self._failures: Dict[str, Deque[float]] = {}
+        self.throttled = 0
+
+    def _prune(self, key: str, now: float) -> Optional[Deque[float]]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key: str) -> Optional[int]:
+        """Seconds until `key` may try again, or None if it is not throttled."""
+        now = time.monotonic()
+        failures = self._prune(key, now)
+        if failures is None or len(failures) < self.max_attempts:
+            return None
+        self.throttled += 1
+        return max(1, int(failures[0] + self.window - now) + 1)
+
+    def record_failure(self, key: str) -> None:
+        now = time.monotonic()
+        if key not in self._failures and len(self._failures) >= self.max_keys:
+            # Bound memory under a spray of distinct keys: drop expired keys,
+            # then the key whose latest failure is oldest
+            for stale in list(self._failures):
+                self._prune(stale, now)
+            if len(self._failures) >= self.max_keys:
+                oldest = min(self._failures, key=lambda k: self._failures[k][-1])
+                del self._failures[oldest]
+        self._failures.setdefault(key, deque(maxlen=self.max_attempts)).append(now)
+
+    def reset(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"tracked_keys": len(self._failures), "throttled": self.throttled}
@@ -0,0 +1,226 @@
+"""
+In-memory layout index for the calendar timeline.
+
+Events are kept sorted by (start_date, id) next to a max-tree over their end
+dates, so the events overlapping a viewport are found in O((k + 1) log n)
+without scanning the table. Overlap lanes and per-year counts are assigned
+over the whole timeline, so an event keeps its lane in every viewport.
+
+Calendar writes patch the index in place after they commit. The index also
+records the calendar version it reflects; any other change (a script, a
+write that raced with the patch) leaves it behind, and it is reloaded from
+the database on the next query.
+"""
+
+import asyncio
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from versions import get_version
+
+COLLECTION = "calendar"
+
+
+def month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+class TimelineEvent:
+    __slots__ = ("id", "start", "end", "data", "lane")
+
+    def __init__(self, event):
+        self.id = event.id
+        self.start = event.start_date
+        # An event without an end date lasts a single day
+        self.end = event.end_date or event.start_date
+        self.data = jsonable_encoder(event)
+        self.lane = 0
+
+    @property
+    def key(self) -> Tuple[date, int]:
+        return (self.start, self.id)
+
+
+class TimelineIndex:
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._events: List[TimelineEvent] = []
+        self._keys: List[Tuple[date, int]] = []
+        self._by_id: Dict[int, TimelineEvent] = {}
+        self._stale_layout = True
+        self._tree: List[int] = []
+        self._leaves = 0
+        self._lanes = 0
+        self._year_counts: Counter = Counter()
+        self._load_lock = asyncio.Lock()
+        self.reloads = 0
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def is_current(self) -> bool:
+        return self.version == get_version(COLLECTION).version
+
+    async def ensure_current(self, load: Callable[[], Awaitable[Iterable[Any]]]) -> None:
+        """Reload from `load()` unless the index reflects the current version."""
+        if self.is_current():
+            return
+        async with self._load_lock:
+            if self.is_current():
+                return
+            version = get_version(COLLECTION).version
+            events = await load()
+            self.replace(events, version)
+
+    def replace(self, events: Iterable[Any], version: Optional[int]) -> None:
+        entries = sorted((TimelineEvent(event) for event in events), key=lambda entry: entry.key)
+        self._events = entries
+        self._keys = [entry.key for entry in entries]
+        self._by_id = {entry.id: entry for entry in entries}
+        self._stale_layout = True
+        self.version = version
+        self.reloads += 1
+
+    def apply(self, expected_version: int, upsert: Any = None, remove: Optional[int] = None) -> None:
+        """
+        Patch the index after a committed write. `expected_version` is the
+        calendar version read before the commit; the patch is only valid if
+        the index was current then and this write was the only bump since.
+        """
+        if self.version != expected_version or get_version(COLLECTION).version != expected_version + 1:
+            self.version = None
+            return
+        self.version = expected_version + 1
+        previous = self._by_id.get(getattr(upsert, "id", None)) if upsert is not None else None
+        if remove is None and previous is not None and self._update_in_place(previous, TimelineEvent(upsert)):
+            return
+
+        for event_id in (remove, getattr(upsert, "id", None)):
+            entry = self._by_id.pop(event_id, None) if event_id is not None else None
+            if entry is not None:
+                position = bisect_left(self._keys, entry.key)
+                del self._keys[position]
+                del self._events[position]
+        if upsert is not None:
+            entry = TimelineEvent(upsert)
+            position = bisect_left(self._keys, entry.key)
+            self._keys.insert(position, entry.key)
+            self._events.insert(position, entry)
+            self._by_id[entry.id] = entry
+        # Positions shifted, so lanes and the tree are rebuilt on the next query
+        self._stale_layout = True
+
+    def _update_in_place(self, previous: TimelineEvent, entry: TimelineEvent) -> bool:
+        """
+        Swap in an edited event that keeps its position (same start date) and
+        its months (lanes are assigned per month), so no lane or year count can
+        change: only its tree leaf is updated. False if a relayout is needed.
+        """
+        if self._stale_layout or entry.key != previous.key or month_index(entry.end) != month_index(previous.end):
+            return False
+        position = bisect_left(self._keys, entry.key)
+        entry.lane = previous.lane
+        self._events[position] = entry
+        self._by_id[entry.id] = entry
+
+        node = self._leaves + position
+        self._tree[node] = entry.end.toordinal()
+        node //= 2
+        while node:
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+        return True
+
+    def _layout(self) -> None:
+        """Assign lanes, rebuild the end-date tree and count events per year."""
+        if not self._stale_layout:
+            return
+
+        # Greedy interval colouring at month resolution, which is what the
+        # timeline draws: reuse the lowest lane whose last event has ended
+        active: List[Tuple[int, int]] = []
+        free: List[int] = []
+        lanes = 0
+        years: Counter = Counter()
+        for entry in self._events:
+            start_month = month_index(entry.start)
+            while active and active[0][0] < start_month:
+                heapq.heappush(free, heapq.heappop(active)[1])
+            if free:
+                entry.lane = heapq.heappop(free)
+            else:
+                entry.lane = lanes
+                lanes += 1
+            heapq.heappush(active, (month_index(entry.end), entry.lane))
+            years.update(range(entry.start.year, entry.end.year + 1))
+
+        leaves = 1
+        while leaves < len(self._events):
+            leaves *= 2
+        tree = [0] * (2 * leaves)
+        for position, entry in enumerate(self._events):
+            tree[leaves + position] = entry.end.toordinal()
+        for node in range(leaves - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+
+        self._tree, self._leaves = tree, leaves
+        self._lanes = lanes
+        self._year_counts = years
+        self._stale_layout = False
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def overlapping(self, date_from: Optional[date], date_to: Optional[date]) -> List[TimelineEvent]:
+        """Events with start <= date_to and end >= date_from, in start order."""
+        self._layout()
+        limit = len(self._events) if date_to is None else bisect_right(self._keys, (date_to, float("inf")))
+        if date_from is None:
+            return self._events[:limit]
+
+        bound = date_from.toordinal()
+        found: List[TimelineEvent] = []
+        # Descend only into subtrees that contain an event ending late enough
+        stack = [(1, 0, self._leaves)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or self._tree[node] < bound:
+                continue
+            if high - low == 1:
+                found.append(self._events[low])
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        return found
+
+    def viewport(self, date_from: Optional[date], date_to: Optional[date]) -> Dict[str, Any]:
+        events = self.overlapping(date_from, date_to)
+        years = self._year_counts
+        if date_from is not None:
+            years = {year: count for year, count in years.items() if year >= date_from.year}
+        if date_to is not None:
+            years = {year: count for year, count in years.items() if year <= date_to.year}
+        return {
+            "from": date_from,
+            "to": date_to,
+            "lanes": self._lanes,
+            "events": [{**entry.data, "lane": entry.lane} for entry in events],
+            "year_counts": {str(year): count for year, count in sorted(years.items())},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events": len(self._events),
+            "version": self.version,
+            "current": self.is_current(),
+            "reloads": self.reloads,
+        }
+
+
+timeline_index = TimelineIndex()
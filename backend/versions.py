@@ -0,0 +1,214 @@
+"""
+Per-collection change tracking for the public API.
+
+Admin writes call `touch(session, "projects", ...)` before committing. The
+commit bumps the collection's row in the `changeversion` table inside the
+same transaction, and once it has committed the new versions are applied
+locally. HTTP validators and caches are derived from these versions, so
+readers can tell whether anything changed without querying the database.
+
+Every instance also polls the table (one small query every
+VERSION_POLL_INTERVAL seconds) and applies versions bumped by other
+instances, so their caches are invalidated without a shared cache service.
+"""
+
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, event, exc, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from models import ChangeVersion
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ("about", "projects", "technologies", "calendar", "resume", "settings")
+
+# Epoch of versions that have not been loaded from the database (scripts,
+# or the table is unavailable); they restart at 0 on every boot
+BOOT_ID = secrets.token_hex(8)
+
+_TOUCHED_KEY = "touched_collections"
+_COMMITTED_KEY = "committed_versions"
+
+TABLE = ChangeVersion.__table__
+COLUMNS = (TABLE.c.collection, TABLE.c.version, TABLE.c.epoch, TABLE.c.updated_at)
+
+
+class CollectionVersion:
+    def __init__(self):
+        self.version = 0
+        self.epoch = BOOT_ID
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+_versions: Dict[str, CollectionVersion] = {name: CollectionVersion() for name in COLLECTIONS}
+_listeners: List[Callable[[str], None]] = []
+
+
+def get_version(collection: str) -> CollectionVersion:
+    return _versions[collection]
+
+
+def on_change(listener: Callable[[str], None]) -> Callable[[str], None]:
+    """Register `listener(collection)` to run after a collection changes."""
+    _listeners.append(listener)
+    return listener
+
+
+def _notify(collection: str) -> None:
+    for listener in _listeners:
+        listener(collection)
+
+
+def bump(*collections: str) -> None:
+    """Local-only bump, for collections without a row in the version table."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for collection in collections:
+        current = _versions[collection]
+        current.version += 1
+        # Last-Modified has one-second resolution; keep it strictly increasing
+        # so If-Modified-Since never hides a write made in the same second
+        current.last_modified = max(now, current.last_modified + timedelta(seconds=1))
+        _notify(collection)
+
+
+def apply_versions(rows: Iterable) -> List[str]:
+    """Adopt versions read from the table; returns the collections that moved."""
+    changed = []
+    for row in rows:
+        current = _versions.get(row.collection)
+        if current is None:
+            continue
+        if row.epoch == current.epoch and row.version <= current.version:
+            continue
+        current.version = row.version
+        current.epoch = row.epoch
+        current.last_modified = row.updated_at.replace(tzinfo=timezone.utc)
+        changed.append(row.collection)
+        _notify(row.collection)
+    return changed
+
+
+def touch(session: Session, *collections: str) -> None:
+    """Mark collections as changed by the session's current transaction."""
+    for collection in collections:
+        if collection not in _versions:
+            raise ValueError(f"Unknown collection '{collection}'")
+    session.info.setdefault(_TOUCHED_KEY, set()).update(collections)
+
+
+# -------------------------
+# Transaction hooks
+# -------------------------
+@event.listens_for(Session, "before_commit")
+def _write_touched(session):
+    touched = session.info.get(_TOUCHED_KEY)
+    if not touched:
+        return
+    names = sorted(touched)
+    conn = session.connection()
+    # The UPDATE comes first so concurrent writers serialize on the row locks
+    conn.execute(
+        update(TABLE).where(TABLE.c.collection.in_(names)).values(version=TABLE.c.version + 1)
+    )
+    rows = conn.execute(select(*COLUMNS).where(TABLE.c.collection.in_(names))).all()
+    if not rows:
+        return
+    now = datetime.utcnow().replace(microsecond=0)
+    stamps = {row.collection: max(now, row.updated_at + timedelta(seconds=1)) for row in rows}
+    conn.execute(
+        update(TABLE)
+        .where(TABLE.c.collection == bindparam("name"))
+        .values(updated_at=bindparam("stamp")),
+        [{"name": name, "stamp": stamp} for name, stamp in stamps.items()],
+    )
+    session.info[_COMMITTED_KEY] = [
+        ChangeVersion(
+            collection=row.collection,
+            version=row.version,
+            epoch=row.epoch,
+            updated_at=stamps[row.collection],
+        )
+        for row in rows
+    ]
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_touched(session):
+    touched = session.info.pop(_TOUCHED_KEY, None)
+    committed = session.info.pop(_COMMITTED_KEY, [])
+    if not touched:
+        return
+    apply_versions(committed)
+    # Collections without a row (table not created yet) only move locally
+    written = {row.collection for row in committed}
+    bump(*sorted(touched - written))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched(session):
+    session.info.pop(_TOUCHED_KEY, None)
+    session.info.pop(_COMMITTED_KEY, None)
+
+
+# -------------------------
+# Loading and polling
+# -------------------------
+def load_versions(engine: Engine) -> None:
+    """Create missing version rows and adopt the stored versions, at startup."""
+    with engine.connect() as conn:
+        stored = set(conn.execute(select(TABLE.c.collection)).scalars())
+        missing = [name for name in COLLECTIONS if name not in stored]
+        if missing:
+            now = datetime.utcnow().replace(microsecond=0)
+            try:
+                conn.execute(insert(TABLE), [
+                    {"collection": name, "version": 0, "epoch": secrets.token_hex(8), "updated_at": now}
+                    for name in missing
+                ])
+                conn.commit()
+            except exc.IntegrityError:
+                # Another instance inserted them first
+                conn.rollback()
+        apply_versions(conn.execute(select(*COLUMNS)).all())
+
+
+async def refresh_versions(engine: AsyncEngine) -> List[str]:
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(*COLUMNS))).all()
+    return apply_versions(rows)
+
+
+async def poll_loop(engine: AsyncEngine, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changed = await refresh_versions(engine)
+        except Exception as e:
+            logger.warning(f"Version poll failed: {e}")
+            continue
+        if changed:
+            logger.info(f"Collections changed on another instance: {', '.join(changed)}")
+
+
+_poll_task: Optional[asyncio.Task] = None
+
+
+def start_version_polling(engine: AsyncEngine, interval: float) -> None:
+    global _poll_task
+    if _poll_task is None and interval > 0:
+        _poll_task = asyncio.create_task(poll_loop(engine, interval))
+
+
+async def stop_version_polling() -> None:
+    global _poll_task
+    if _poll_task is not None:
+        _poll_task.cancel()
+        await asyncio.gather(_poll_task, return_exceptions=True)
+        _poll_task = None
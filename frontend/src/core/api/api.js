@@ -14,6 +14,17 @@ export const login = async (credentials) => {
     return response.data;
 };
 
+// ============================================
+// BOOTSTRAP API
+// ============================================
+// Several public sections in one request, e.g. ['about', 'technologies']
+export const getBootstrap = async (fields) => {
+    const response = await client.get('/bootstrap/', {
+        params: fields ? { fields: fields.join(',') } : undefined,
+    });
+    return response.data;
+};
+
 // ============================================
 // PROJECTS API
 // ============================================
@@ -69,6 +80,18 @@ export const getEvents = async () => {
     return response.data;
 };
 
+// One page of events overlapping [from, to] (ISO dates); pass the returned
+// nextCursor back in to fetch the following page
+export const getEventsPage = async ({ from, to, projectId, limit = 100, cursor } = {}) => {
+    const response = await client.get('/calendar/', {
+        params: { from, to, project_id: projectId, limit, cursor },
+    });
+    return {
+        events: response.data,
+        nextCursor: response.headers['x-next-cursor'] ?? null,
+    };
+};
+
 export const createEvent = async (eventData) => {
     const response = await client.post('/calendar/', eventData);
     return response.data;
@@ -124,11 +147,32 @@ export const getResume = async () => {
     return response.data;
 };
 
+// The resume JSON itself, without the string wrapper
+export const getResumeDocument = async () => {
+    const response = await client.get('/resume/document');
+    return response.data;
+};
+
 export const uploadResume = async (resumeData) => {
     const response = await client.post('/resume/', resumeData);
     return response.data;
 };
 
+// One section: header, experience, education, skills, certifications or languages
+// (data/resume/sections/<name>.json in the static snapshot)
+export const getResumeSection = async (name) => {
+    const response = await client.get(`/resume/sections/${name}`);
+    return response.data;
+};
+
+// JSON Patch operations against the document; only touched sections are written
+export const patchResume = async (operations) => {
+    const response = await client.patch('/resume/', operations, {
+        headers: { 'Content-Type': 'application/json-patch+json' },
+    });
+    return response.data;
+};
+
 // ============================================
 // SETTINGS API
 // ============================================
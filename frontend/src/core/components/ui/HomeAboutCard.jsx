@@ -33,10 +33,10 @@ const HomeAboutCard = ({ aboutData, technologies }) => {
                 }
             `}</style>
             {/* Avatar */}
-            {aboutData?.avatar_image && (
+            {aboutData?.avatar_image_url && (
                 <div className="mb-4">
                     <img
-                        src={`data:image/jpeg;base64,${aboutData.avatar_image}`}
+                        src={aboutData.avatar_image_url}
                         alt="Avatar"
                         className="w-48 h-48 rounded-full object-cover border-4 border-white/30 shadow-xl"
                     />
@@ -86,9 +86,10 @@ const HomeAboutCard = ({ aboutData, technologies }) => {
                         {technologies.map((tech) => (
                             <SwiperSlide key={tech.id} className="!w-24 !h-24">
                                 <div className="w-full h-full rounded-xl bg-surface/60 backdrop-blur-md flex flex-col items-center justify-center p-2 border border-white/10 hover:bg-surface/80 transition-colors">
-                                    {tech.image && (
+                                    {tech.image_url && (
                                         <img
-                                            src={`data:image/png;base64,${tech.image}`}
+                                            src={tech.image_url}
+                                            loading="lazy"
                                             alt={tech.title}
                                             className="w-12 h-12 object-contain mb-2"
                                         />
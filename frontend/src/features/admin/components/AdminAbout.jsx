@@ -257,13 +257,13 @@ const validateField = (field, value) => {
             {errors.avatar_image && <p className="text-sm text-red-500 mt-1">{errors.avatar_image}</p>}
 
 
-            {aboutData?.avatar_image && (
+            {aboutData?.avatar_image_url && (
               <div className="mt-2">
                 <p className="text-xs text-primary mb-1">
                   Current Avatar:
                 </p>
                 <img
-                  src={`data:image/jpeg;base64,${aboutData.avatar_image}`}
+                  src={aboutData.avatar_image_url}
                   alt="Current Avatar"
                   className="w-16 h-16 rounded-full object-cover border-2 border-white shadow-md"
                 />
@@ -377,9 +377,9 @@ const validateField = (field, value) => {
               key={tech.id}
               className="bg-white/40 dark:bg-slate-800/40 p-4 rounded-xl border border-white/20 dark:border-slate-700 flex flex-col items-center gap-3 hover:bg-white/20 transition-colors relative group"
             >
-              {tech.image && (
+              {tech.image_url && (
                 <img
-                  src={`data:image/jpeg;base64,${tech.image}`}
+                  src={tech.image_url}
                   alt={tech.title}
                   className="w-12 h-12 object-contain"
                 />
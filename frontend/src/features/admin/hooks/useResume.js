@@ -1,5 +1,5 @@
 import { useState, useCallback } from 'react';
-import { getResume, uploadResume } from '@/core/api/api';
+import { getResumeDocument, patchResume, uploadResume } from '@/core/api/api';
 import { useToast } from '@/core/context/ToastContext';
 
 export const useResume = () => {
@@ -10,13 +10,9 @@ export const useResume = () => {
     const fetchResume = useCallback(async () => {
         setLoading(true);
         try {
-            const data = await getResume();
-            if (data && data.content) {
-                try {
-                    setResumeData(JSON.parse(data.content));
-                } catch (e) {
-                    setResumeData(null);
-                }
+            const data = await getResumeDocument();
+            if (data) {
+                setResumeData(data);
             }
         } catch (err) {
             console.error(err);
@@ -28,7 +24,23 @@ export const useResume = () => {
     const updateResume = async (formData) => {
         setLoading(true);
         try {
-            await uploadResume({ content: JSON.stringify(formData) });
+            if (resumeData) {
+                // Send only the top-level members that changed or were dropped
+                const pointer = (key) => `/${key.replace(/~/g, '~0').replace(/\//g, '~1')}`;
+                const operations = [
+                    ...Object.keys(formData)
+                        .filter((key) => JSON.stringify(formData[key]) !== JSON.stringify(resumeData[key]))
+                        .map((key) => ({ op: 'add', path: pointer(key), value: formData[key] })),
+                    ...Object.keys(resumeData)
+                        .filter((key) => !(key in formData))
+                        .map((key) => ({ op: 'remove', path: pointer(key) })),
+                ];
+                if (operations.length) {
+                    await patchResume(operations);
+                }
+            } else {
+                await uploadResume({ content: JSON.stringify(formData) });
+            }
             addToast('Resume updated successfully!', 'success');
             fetchResume();
             return true;
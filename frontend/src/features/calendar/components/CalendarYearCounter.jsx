@@ -1,9 +1,14 @@
-const CalendarYearCounter = ({ year }) => {
+const CalendarYearCounter = ({ year, count }) => {
     return (
         <div className="absolute top-24 left-10 z-0 pointer-events-none">
             <h1 className="text-[15vw] font-bold text-primary/30 leading-none tracking-tighter transition-all duration-300">
                 {year}
             </h1>
+            {count > 0 && (
+                <p className="text-xl text-secondary tracking-widest uppercase mt-2">
+                    {count} {count === 1 ? 'event' : 'events'}
+                </p>
+            )}
         </div>
     );
 };
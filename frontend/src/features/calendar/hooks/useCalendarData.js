@@ -1,8 +1,9 @@
 import { useState, useEffect } from 'react';
-import { getEvents, getSettings } from '@/core/api/api';
+import { getBootstrap } from '@/core/api/api';
 
 export const useCalendarData = () => {
     const [events, setEvents] = useState([]);
+    const [yearCounts, setYearCounts] = useState({});
     const [settings, setSettings] = useState({ calendar_start_year: 2024, calendar_end_year: 2030 });
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -10,14 +11,13 @@ export const useCalendarData = () => {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [eventsData, settingsData] = await Promise.all([
-                    getEvents(),
-                    getSettings()
-                ]);
+                // Events come with server-assigned lanes for the settings window
+                const data = await getBootstrap(['timeline', 'settings']);
 
-                setEvents(eventsData);
-                if (settingsData) {
-                    setSettings(settingsData);
+                setEvents(data.timeline.events);
+                setYearCounts(data.timeline.year_counts);
+                if (data.settings) {
+                    setSettings(data.settings);
                 }
             } catch (err) {
                 console.error("Failed to fetch calendar data", err);
@@ -29,5 +29,5 @@ export const useCalendarData = () => {
         fetchData();
     }, []);
 
-    return { events, settings, loading, error };
+    return { events, yearCounts, settings, loading, error };
 };
@@ -31,8 +31,9 @@ export const useTimelineCalculations = (settings) => {
         const durationMonths = ((endDate.getFullYear() - startYearVal) * 12) + (endDate.getMonth() - startMonth) + 1;
         const width = (durationMonths / (totalYears * 12)) * totalWidth;
 
-        // Stagger vertical position to avoid overlap (simple modulo for now)
-        const top = 150 + (index % 5) * 70;
+        // One row per overlap lane, assigned by the server
+        const lane = event.lane ?? index % 5;
+        const top = 150 + lane * 70;
 
         return {
             left: `${left}px`,
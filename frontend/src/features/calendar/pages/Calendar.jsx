@@ -7,7 +7,7 @@ import CalendarScrollbar from '../components/CalendarScrollbar';
 import CalendarYearCounter from '../components/CalendarYearCounter';
 
 const Calendar = () => {
-    const { events, settings } = useCalendarData();
+    const { events, yearCounts, settings } = useCalendarData();
     const { startYear, endYear, totalYears, totalWidth, getEventStyle } = useTimelineCalculations(settings);
 
     const containerRef = useRef(null);
@@ -24,7 +24,7 @@ const Calendar = () => {
 
     return (
         <div ref={containerRef} className="h-screen w-full bg-surface text-primary overflow-hidden relative font-sans transition-colors duration-300">
-            <CalendarYearCounter year={currentYear} />
+            <CalendarYearCounter year={currentYear} count={yearCounts[currentYear]} />
 
             <CalendarTimeline
                 ref={trackRef}
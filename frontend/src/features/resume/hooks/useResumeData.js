@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getResume } from '@/core/api/api';
+import { getResumeDocument } from '@/core/api/api';
 
 export const useResumeData = () => {
     const [resumeData, setResumeData] = useState(null);
@@ -9,12 +9,8 @@ export const useResumeData = () => {
     useEffect(() => {
         const fetchResume = async () => {
             try {
-                const response = await getResume();
-                if (response?.content) {
-                    setResumeData(JSON.parse(response.content));
-                } else {
-                    setResumeData(null);
-                }
+                const document = await getResumeDocument();
+                setResumeData(document ?? null);
             } catch (err) {
                 console.error(err);
                 setError('Failed to fetch resume');
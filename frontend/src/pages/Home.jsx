@@ -1,7 +1,7 @@
 import { useEffect, useRef, useState } from 'react';
 import gsap from 'gsap';
 
-import { getAbout, getAboutTechnologies } from '../core/api/api';
+import { getBootstrap } from '../core/api/api';
 import { useTheme } from '../core/context/ThemeContext';
 import HomeResumeCard from '../core/components/ui/HomeResumeCard';
 import HomeCalendarCard from '../core/components/ui/HomeCalendarCard';
@@ -22,11 +22,9 @@ const Home = () => {
     useEffect(() => {
         const fetchAboutData = async () => {
             try {
-                const aboutRes = await getAbout();
-                setAboutData(aboutRes);
-
-                const techRes = await getAboutTechnologies();
-                setTechnologies(techRes);
+                const data = await getBootstrap(['about', 'technologies']);
+                setAboutData(data.about);
+                setTechnologies(data.technologies);
             } catch (error) {
                 console.error('Error fetching about data:', error);
             }